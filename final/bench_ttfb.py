@@ -0,0 +1,107 @@
+"""Time-to-first-byte benchmark for the ADK ``/run_sse`` endpoint.
+
+Sends the same prompt ``--runs`` times, each in a fresh session, and reports
+the median and p95 of:
+
+- ``headers``: until the response headers arrive
+- ``first_event``: until the first SSE event
+- ``first_text``: until the first event carrying text (partial or not)
+- ``total``: until the stream ends
+
+Run it against the server before and after a change, saving each result
+with ``--save``, then pass the earlier file to ``--compare``:
+
+    python bench_ttfb.py --prompt "Show me the menu" --save before.json
+    python bench_ttfb.py --prompt "Show me the menu" --compare before.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import httpx
+
+METRICS = ("headers", "first_event", "first_text", "total")
+
+
+def run_once(client: httpx.Client, args) -> dict[str, float]:
+    session = client.post(f"/apps/{args.app}/users/{args.user}/sessions", json={})
+    session.raise_for_status()
+    body = {
+        "appName": args.app,
+        "userId": args.user,
+        "sessionId": session.json()["id"],
+        "newMessage": {"role": "user", "parts": [{"text": args.prompt}]},
+        "streaming": not args.no_stream,
+    }
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+    with client.stream("POST", "/run_sse", json=body) as response:
+        response.raise_for_status()
+        timings["headers"] = time.perf_counter() - start
+        for line in response.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            now = time.perf_counter() - start
+            timings.setdefault("first_event", now)
+            event = json.loads(line[len("data:"):])
+            parts = (event.get("content") or {}).get("parts") or []
+            if any(part.get("text") for part in parts):
+                timings.setdefault("first_text", now)
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+
+def summarize(samples: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    summary = {}
+    for metric in METRICS:
+        values = sorted(s[metric] * 1000 for s in samples if metric in s)
+        if values:
+            summary[metric] = {
+                "p50": statistics.median(values),
+                "p95": values[min(len(values) - 1, round(0.95 * (len(values) - 1)))],
+            }
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--app", default="orchestrator_agent")
+    parser.add_argument("--user", default="bench")
+    parser.add_argument("--prompt", default="What do you have on the menu?")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-stream", action="store_true", help="ask ADK for non-streaming mode")
+    parser.add_argument("--save", help="write the summary to this JSON file")
+    parser.add_argument("--compare", help="a summary saved earlier with --save")
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.url, timeout=300) as client:
+        samples = []
+        for i in range(args.runs):
+            samples.append(run_once(client, args))
+            print(f"run {i + 1}: " + ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in samples[-1].items()))
+    summary = summarize(samples)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(f"\n{'metric':<12} {'p50 ms':>10} {'p95 ms':>10} {'Δ p50 ms':>10}")
+    for metric, stats in summary.items():
+        delta = ""
+        if metric in baseline:
+            delta = f"{stats['p50'] - baseline[metric]['p50']:+.0f}"
+        print(f"{metric:<12} {stats['p50']:>10.0f} {stats['p95']:>10.0f} {delta:>10}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    if "first_text" not in summary:
+        sys.exit("No run produced any text")
+
+
+if __name__ == "__main__":
+    main()
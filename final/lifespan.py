@@ -0,0 +1,53 @@
+"""App lifespan: warm the orchestrator up before serving, close its clients on shutdown.
+
+Startup builds the agent tree and resolves every seller card over the
+shared, pooled HTTP client, so the first user request pays none of that.
+On shutdown (SIGTERM on Cloud Run) uvicorn stops accepting connections and
+gives open requests ``SHUTDOWN_GRACE_SECONDS`` to finish; then the seller
+HTTP clients and the session store's database connections are closed.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.util import greenlet_spawn
+
+WARM_UP_TIMEOUT_SECONDS = float(os.getenv("WARM_UP_TIMEOUT_SECONDS", "20"))
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("SHUTDOWN_GRACE_SECONDS", "8"))
+
+# The ADK session service builds its own engine; remember every engine that connects
+_engines: set[Engine] = set()
+
+
+@event.listens_for(Engine, "engine_connect")
+def _track_engine(connection, *args):
+    _engines.add(connection.engine)
+
+
+async def close_engines() -> None:
+    for engine in list(_engines):
+        # Also works for the sync side of an async engine
+        await greenlet_spawn(engine.dispose)
+    _engines.clear()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    from orchestrator_agent import agent
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(agent.warm_up(), WARM_UP_TIMEOUT_SECONDS)
+    except Exception as e:
+        # Serve anyway; sellers not resolved yet are resolved on first use
+        print(f"ERROR: Warm-up did not finish: {e!r}")
+    print(f"Warm-up took {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    yield
+
+    await agent.aclose()
+    await close_engines()
@@ -2,6 +2,10 @@ import os
 import uvicorn
 from google.adk.cli.fast_api import get_fast_api_app
 
+from frontdoor import FrontDoorMiddleware
+from lifespan import SHUTDOWN_GRACE_SECONDS, lifespan
+from orchestrator_agent.deadline import DeadlineMiddleware
+
 # Get the directory where main.py is located
 AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
 # Example session service URI (e.g., SQLite)
@@ -18,8 +22,21 @@ app = get_fast_api_app(
     session_service_uri=SESSION_SERVICE_URI,
     allow_origins=ALLOWED_ORIGINS,
     web=SERVE_WEB_INTERFACE,
+    lifespan=lifespan,
 )
 
+# Fair per-user admission for the run endpoints, with stats at /frontdoor/stats
+app.add_middleware(FrontDoorMiddleware)
+# Each request gets a deadline (X-Request-Deadline / X-Request-Timeout or
+# REQUEST_BUDGET_SECONDS) that seller calls inherit; added last so it is
+# outermost and queueing time counts against the deadline
+app.add_middleware(DeadlineMiddleware)
+
 if __name__ == "__main__":
     # Use the PORT environment variable provided by Cloud Run, defaulting to 8080
-    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 8080)),
+        timeout_graceful_shutdown=int(SHUTDOWN_GRACE_SECONDS),
+    )
@@ -1,76 +1,236 @@
-from google.adk.agents import Agent
-from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
-from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+"""Orchestrator agent that delegates to remote sellers from ``sellers.json``.
+
+Importing this module does no network or client work. The ADK agent tree
+and its HTTP client are built by ``get_root_agent()`` the first time
+``root_agent`` is read (which is how the ADK loader picks the agent up) or
+earlier during startup warm-up.
+"""
+
+import asyncio
 import os
-import subprocess
+import threading
+from urllib.parse import urlsplit
+
 import httpx
 
 # Load environment variables (Optional, if you are using environment variables)
 from dotenv import load_dotenv
 load_dotenv()
 
-
-# Get the authentication token
-auth_token = os.getenv('AUTH_TOKEN', '')
-
-# Create HTTP client with authentication headers
-headers = {
-    'Authorization': f'Bearer {auth_token}',
-    'Content-Type': 'application/json'
-}
-
-# Create custom HTTP client with authentication
-httpx_client = httpx.AsyncClient(headers=headers)
-
-pizza_agent = RemoteA2aAgent(
-    name="pizza_agent",
-    description="Agent that handles fruit sales.",
-    agent_card=f"https://au-pizza-agent-328611943961.us-central1.run.app/.well-known/agent.json",
-    httpx_client=httpx_client,
-)
-
-burger_agent = RemoteA2aAgent(
-    name="burger_agent",
-    description="Agent that handles vegetable sales.",
-    agent_card=f"https://au-burger-agent-328611943961.us-central1.run.app/.well-known/agent.json",
-    httpx_client=httpx_client,
+SELLERS_CONFIG = os.getenv(
+    "SELLERS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sellers.json")
 )
+SELLER_TOP_K = int(os.getenv("SELLER_TOP_K", "3"))
+DISPATCH_DEADLINE_SECONDS = float(os.getenv("DISPATCH_DEADLINE_SECONDS", "60"))
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "6"))
+CONTEXT_SUMMARY_CHARS = int(os.getenv("CONTEXT_SUMMARY_CHARS", "4000"))
 
-# Orchestrator Agent that delegates tasks
-root_agent = Agent(
-    model="gemini-2.0-flash",
-    name="orchestrator_agent",
-    description="Orchestrates between Fruit and Vegetable Seller Agents.",
-    instruction="""
+INSTRUCTION = """
     # INSTRUCTIONS
 
         You are an Orchestrator Agent.
-        Your sole purpose is to help users buy items from two remote specialized agents:
-        - Burger Agent (handles burger menu & order creation)
-        - Pizza Agent (handles pizza menu & order creation)
+        Your sole purpose is to help users buy items from remote specialized seller agents.
+        The sellers relevant to the current request are listed under SELLERS FOR THIS TURN.
 
         You must not create or assume menus, prices, or order details yourself. 
-        Always rely on Burger Agent and Pizza Agent responses via A2A protocol. 
+        Always rely on the seller agents' responses via A2A protocol. 
         Your role is to interpret user intent, route requests, and deliver the final structured response back to the user.
 
         # CONTEXT
 
-        - If the user asks about burgers → communicate with Burger Agent only.
-        - If the user asks about pizzas → communicate with Pizza Agent only.
-        - If unclear whether the user wants pizza or burger → ask for clarification.
+        - To communicate with a seller, hand the conversation over with `transfer_to_seller`.
+        - If the user asks about items from one seller → communicate with that seller only.
+        - If unclear which seller the user wants → ask for clarification.
         - Do not attempt to answer unrelated questions or use tools for other purposes.
 
         # RULES
 
-        1. Always determine the user's intent (burger or pizza).
+        1. Always determine the user's intent (which seller and which items).
         2. If the user has not confirmed the order and total price → ask for confirmation before proceeding.
         3. If confirmed → forward the structured order request to the respective remote agent using A2A protocol.
-        4. Wait for response from Burger/Pizza Agent and then:
+        4. Wait for response from the seller agent and then:
         - If status = input_required → ask the user for the missing details.
         - If status = error → inform the user that there was an error.
         - If status = completed → present the detailed ordered items, price breakdown, total, and order ID to the user.
         5. Always deliver user-friendly responses while preserving accuracy from the remote agent.
-    """,
-    global_instruction="You are a sales orchestrator that communicates with fruit and vegetable agents.",
-    sub_agents=[pizza_agent, burger_agent],  # Includes both remote agents
-)
+
+        # SELLERS FOR THIS TURN
+
+"""
+
+
+def build_root_agent():
+    """Build the orchestrator; remote sellers come from the registry on demand."""
+    from a2a.client import ClientConfig, ClientFactory
+    from a2a.types import TransportProtocol
+    from google.adk.agents import Agent
+    from google.adk.agents.readonly_context import ReadonlyContext
+    from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
+    from google.adk.tools.tool_context import ToolContext
+
+    from .context_window import ContextWindow
+    from .deadline import propagate_deadline
+    from .directory import SellerDirectory
+    from .dispatch import ParallelDispatchAgent
+    from .registry import SellerRegistry
+
+    # Get the authentication token
+    auth_token = os.getenv('AUTH_TOKEN', '')
+
+    # Create HTTP client with authentication headers
+    headers = {
+        'Authorization': f'Bearer {auth_token}',
+        'Content-Type': 'application/json'
+    }
+
+    # Create custom HTTP client with authentication; every seller call
+    # carries the request deadline and times out with it
+    httpx_client = httpx.AsyncClient(
+        headers=headers, event_hooks={"request": [propagate_deadline]}
+    )
+    _http_clients.append(httpx_client)
+
+    # Stream seller replies (message/stream) so they reach /run_sse as they are written
+    client_factory = ClientFactory(
+        ClientConfig(
+            httpx_client=httpx_client,
+            streaming=True,
+            supported_transports=[TransportProtocol.jsonrpc],
+        )
+    )
+
+    def build_seller(entry: dict) -> RemoteA2aAgent:
+        return RemoteA2aAgent(
+            name=entry["name"],
+            description=entry["description"],
+            # A card fetched by warm_up(), else the URL for the agent to fetch itself
+            agent_card=_resolved_cards.get(entry["agent_card"], entry["agent_card"]),
+            httpx_client=httpx_client,
+            a2a_client_factory=client_factory,
+        )
+
+    registry = SellerRegistry(SELLERS_CONFIG, build_seller)
+
+    def instruction(context: ReadonlyContext) -> str:
+        # Only the sellers relevant to this turn (and the one already in use) go into the prompt
+        parts = context.user_content.parts if context.user_content else []
+        text = " ".join(part.text for part in parts if part.text)
+        sellers = registry.select(
+            text, SELLER_TOP_K, include=(context.state.get("active_seller"),)
+        )
+        listing = "\n".join(
+            f"        - {seller['name']}: {seller['description']}" for seller in sellers
+        )
+        return INSTRUCTION + (listing or "        - No seller matches this request.") + "\n"
+
+    def transfer_to_seller(seller_name: str, tool_context: ToolContext) -> str:
+        """Hands the conversation over to a remote seller agent.
+
+        Args:
+            seller_name: The name of a seller from the sellers listed for this turn.
+            tool_context: The tool context this method runs in.
+        """
+        if registry.get(seller_name) is None:
+            return f"Unknown seller {seller_name}. Use one of the listed sellers."
+        root.ensure_seller(seller_name)
+        tool_context.state["active_seller"] = seller_name
+        tool_context.actions.transfer_to_agent = seller_name
+        return f"Transferring to {seller_name}."
+
+    # Orchestrator Agent that delegates tasks
+    orchestrator = Agent(
+        model="gemini-2.0-flash",
+        name="sales_orchestrator",
+        description="Routes purchase requests to the relevant remote seller agents.",
+        instruction=instruction,
+        global_instruction="You are a sales orchestrator that communicates with remote seller agents.",
+        tools=[transfer_to_seller],
+        # Last turns verbatim, older ones folded into a summary in session state
+        before_model_callback=ContextWindow(CONTEXT_KEEP_TURNS, CONTEXT_SUMMARY_CHARS).apply,
+    )
+
+    # Multi-seller requests fan out concurrently instead of one transfer at a time
+    dispatcher = ParallelDispatchAgent(
+        name="parallel_dispatch",
+        description="Sends a multi-seller request to every seller concurrently.",
+        registry=registry,
+        deadline_seconds=DISPATCH_DEADLINE_SECONDS,
+    )
+
+    root = SellerDirectory(
+        name="orchestrator_agent",
+        description="Orchestrates between remote seller agents.",
+        registry=registry,
+        orchestrator_name=orchestrator.name,
+        dispatcher_name=dispatcher.name,
+        sub_agents=[orchestrator, dispatcher],
+    )
+    return root
+
+
+_root_agent = None
+_root_agent_lock = threading.Lock()
+_http_clients: list[httpx.AsyncClient] = []
+# Seller cards fetched by warm_up(), by card URL; a changed URL is fetched anew
+_resolved_cards: dict[str, object] = {}
+
+
+def get_root_agent():
+    """Return the orchestrator, building it on first use."""
+    global _root_agent
+    with _root_agent_lock:
+        if _root_agent is None:
+            _root_agent = build_root_agent()
+    return _root_agent
+
+
+async def warm_up() -> None:
+    """Build the agent tree and resolve every registered seller's card.
+
+    Cards are fetched with the A2A client's ``A2ACardResolver`` through the
+    shared HTTP client, which leaves a pooled connection open to each seller
+    for the first real request, and handed to the seller agents as they are
+    built.
+    """
+    from a2a.client import A2ACardResolver
+
+    root = get_root_agent()
+    # Cards given as file paths are left to RemoteA2aAgent
+    remote = [
+        (name, root.registry.get(name)["agent_card"])
+        for name in root.registry.names()
+        if root.registry.get(name)["agent_card"].startswith(("http://", "https://"))
+    ]
+
+    async def resolve(url: str):
+        parts = urlsplit(url)
+        resolver = A2ACardResolver(
+            httpx_client=_http_clients[0],
+            base_url=f"{parts.scheme}://{parts.netloc}",
+            agent_card_path=parts.path,
+        )
+        return await resolver.get_agent_card()
+
+    # RemoteA2aAgent otherwise fetches its card inside the first request
+    results = await asyncio.gather(*(resolve(url) for _, url in remote), return_exceptions=True)
+    for (name, url), result in zip(remote, results):
+        if isinstance(result, Exception):
+            print(f"ERROR: Failed to resolve seller {name}: {result}")
+            continue
+        _resolved_cards[url] = result
+        # Built now, with the card in hand
+        root.ensure_seller(name)
+
+
+async def aclose() -> None:
+    """Close the HTTP clients used to reach the sellers."""
+    for client in _http_clients:
+        await client.aclose()
+    _http_clients.clear()
+
+
+def __getattr__(name):
+    # PEP 562: the ADK loader reads `agent.root_agent`, which lands here
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
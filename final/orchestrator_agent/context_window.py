@@ -0,0 +1,117 @@
+import json
+import logging
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# ADK re-labels other agents' replies as user messages starting with this
+_OTHER_AGENT_PREFIX = "For context:"
+
+
+class ContextWindow:
+    """Bounds the conversation sent to the model on every call.
+
+    The last ``keep_turns`` turns (a turn starts at a real user message)
+    are sent verbatim. Older turns are folded, one line per message, into
+    a rolling summary kept in session state, so each turn is folded only
+    once and the summary never grows past ``summary_chars``. Tool calls and
+    large tool results are cut to ``tool_result_chars``. The summary goes in
+    front of the recent turns as a single message.
+
+    Use ``apply`` as (or from) a ``before_model_callback``. Estimated token
+    counts before and after trimming are logged and kept in ``stats()``.
+    """
+
+    def __init__(
+        self,
+        keep_turns: int = 6,
+        summary_chars: int = 4000,
+        message_chars: int = 300,
+        tool_result_chars: int = 500,
+        state_key: str = "context_summary",
+    ):
+        self.keep_turns = keep_turns
+        self.summary_chars = summary_chars
+        self.message_chars = message_chars
+        self.tool_result_chars = tool_result_chars
+        self.state_key = state_key
+        self._stats = {"calls": 0, "trimmed_calls": 0, "tokens_before": 0, "tokens_after": 0}
+
+    def apply(self, callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        contents = llm_request.contents
+        before = estimate_tokens(contents)
+        starts = [i for i, content in enumerate(contents) if _starts_turn(content)]
+        state = callback_context.state
+        summary = state.get(self.state_key) or {"text": "", "turns": 0}
+
+        fold_until = len(starts) - self.keep_turns
+        if fold_until > summary["turns"]:
+            start = starts[summary["turns"]]
+            end = starts[fold_until]
+            lines = [self._fold(content) for content in contents[start:end]]
+            text = "\n".join(line for line in [summary["text"], *lines] if line)
+            # Rolling: drop the oldest lines once over budget
+            if len(text) > self.summary_chars:
+                text = text[-self.summary_chars:].split("\n", 1)[-1]
+            summary = {"text": text, "turns": fold_until}
+            state[self.state_key] = summary
+
+        if summary["turns"] and len(starts) > summary["turns"]:
+            recent = contents[starts[summary["turns"]]:]
+            header = types.Content(
+                role="user",
+                parts=[types.Part(text=f"Summary of the earlier conversation:\n{summary['text']}")],
+            )
+            llm_request.contents = [header, *recent]
+
+        after = estimate_tokens(llm_request.contents)
+        self._stats["calls"] += 1
+        self._stats["trimmed_calls"] += after < before
+        self._stats["tokens_before"] += before
+        self._stats["tokens_after"] += after
+        logger.info("Context tokens (estimated): %d before, %d after trimming", before, after)
+
+    def stats(self) -> dict:
+        return dict(self._stats)
+
+    def _fold(self, content: types.Content) -> str:
+        pieces = []
+        for part in content.parts or []:
+            if part.text:
+                pieces.append(_clip(part.text, self.message_chars))
+            elif part.function_call:
+                args = json.dumps(part.function_call.args or {}, default=str)
+                pieces.append(f"called {part.function_call.name}({_clip(args, self.tool_result_chars)})")
+            elif part.function_response:
+                result = json.dumps(part.function_response.response or {}, default=str)
+                pieces.append(f"{part.function_response.name} returned {_clip(result, self.tool_result_chars)}")
+        return f"{content.role}: {' '.join(pieces)}" if pieces else ""
+
+
+def estimate_tokens(contents: list[types.Content]) -> int:
+    """Rough token count (4 characters per token) of text, tool calls and tool results."""
+    chars = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                chars += len(json.dumps(part.function_response.response or {}, default=str))
+    return chars // 4
+
+
+def _starts_turn(content: types.Content) -> bool:
+    if content.role != "user" or not content.parts:
+        return False
+    text = content.parts[0].text
+    return bool(text) and not text.startswith(_OTHER_AGENT_PREFIX)
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
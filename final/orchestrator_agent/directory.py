@@ -0,0 +1,58 @@
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from .deadline import ensure_deadline
+from .dispatch import PENDING_KEY, dispatch_request, is_read_only, plan_dispatch, user_text
+from .registry import SellerRegistry
+
+
+class SellerDirectory(BaseAgent):
+    """Root agent that owns the orchestrator and the remote sellers built so far.
+
+    A read-only or confirmed turn that addresses several sellers at once
+    goes to the parallel dispatcher; every other turn starts at the
+    orchestrator, which asks before placing orders. Sellers are attached as
+    sub-agents on demand, which lets the orchestrator transfer to them by
+    name, while the orchestrator itself has no sub-agents and so never gets
+    the whole seller list injected into its prompt.
+    """
+
+    registry: SellerRegistry
+    orchestrator_name: str
+    dispatcher_name: str | None = None
+
+    def ensure_seller(self, name: str) -> BaseAgent:
+        """Build seller ``name`` if needed and attach it to the agent tree."""
+        agent = self.registry.agent(name)
+        if agent.parent_agent is not self:
+            # Replaces a stale agent of the same name after a config reload
+            self.sub_agents = [a for a in self.sub_agents if a.name != name] + [agent]
+            agent.parent_agent = self
+        return agent
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        # Calls to the sellers carry what is left of this budget
+        ensure_deadline(ctx.invocation_id)
+        agent = self.find_sub_agent(self.orchestrator_name)
+        if self.dispatcher_name:
+            text = user_text(ctx)
+            pending = ctx.session.state.get(PENDING_KEY)
+            if dispatch_request(text, pending, self.registry) is not None:
+                agent = self.find_sub_agent(self.dispatcher_name)
+            else:
+                # Hold a multi-seller order until it is confirmed; anything else drops a stale one
+                hold = text if not is_read_only(text) and plan_dispatch(text, self.registry) else None
+                if hold != pending:
+                    yield Event(
+                        invocation_id=ctx.invocation_id,
+                        author=self.name,
+                        branch=ctx.branch,
+                        actions=EventActions(state_delta={PENDING_KEY: hold}),
+                    )
+        async for event in agent.run_async(ctx):
+            yield event
@@ -0,0 +1,194 @@
+import asyncio
+import re
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from .deadline import remaining
+from .registry import SellerRegistry
+
+# Clause boundaries in requests such as "a pizza and two burgers, plus fries";
+# not "with", which qualifies an item ("pizza with extra cheese")
+_CLAUSE_SPLIT = re.compile(r",|;|&|\band\b|\bplus\b|\balso\b", re.IGNORECASE)
+
+# Questions about what sellers offer; anything else, even a bare "a pizza and two apples"
+# or a question such as "can I get a pizza and a burger?", counts as an order that needs
+# the user's confirmation before any seller sees it. When in doubt a request is an order.
+_READ_ONLY = re.compile(
+    r"\b(what|which|show|list|menu|price|prices|cost|how much|available|in stock|do you have)\b",
+    re.IGNORECASE,
+)
+_ORDER_INTENT = re.compile(
+    r"\b(buy|order|purchase|reserve|book|checkout|pay|add|get|send|deliver|bring|give|take|grab|want|need"
+    r"|can i have|could i have|i'll have|i'd like|i would like)\b",
+    re.IGNORECASE,
+)
+# A reply confirming the order the orchestrator summarised on the previous turn
+_CONFIRMATION = re.compile(
+    r"^\s*(yes|yeah|yep|sure|ok|okay|confirm|confirmed|go ahead|proceed|place (the|my) order)\b",
+    re.IGNORECASE,
+)
+
+# Session state key of a multi-seller order waiting for the user's confirmation
+PENDING_KEY = "pending_dispatch"
+
+# A clause must match a seller at least this strongly to count as an intent
+MIN_INTENT_SCORE = 0.5
+
+
+def plan_dispatch(text: str, registry: SellerRegistry) -> list[str]:
+    """Sellers addressed by separate clauses of ``text``, in first-mention order.
+
+    Returns at least two names for a multi-intent request and an empty list
+    otherwise, so a single-seller request stays on the orchestrator.
+    """
+    sellers: list[str] = []
+    for clause in _CLAUSE_SPLIT.split(text):
+        if not clause.strip():
+            continue
+        for entry in registry.select(clause, 1, min_score=MIN_INTENT_SCORE):
+            if entry["name"] not in sellers:
+                sellers.append(entry["name"])
+    return sellers if len(sellers) > 1 else []
+
+
+def is_read_only(text: str) -> bool:
+    """Whether ``text`` only asks what sellers offer, so it may reach them unconfirmed.
+
+    >>> is_read_only("What pizzas and fruits do you have?")
+    True
+    >>> is_read_only("Show me the burger menu and the fruit prices")
+    True
+    >>> is_read_only("a pizza and two apples")
+    False
+    >>> is_read_only("Can I get a pizza and a burger?")
+    False
+    >>> is_read_only("Could you send two apples and a pizza?")
+    False
+    >>> is_read_only("What if I take a pizza and three bananas?")
+    False
+    """
+    return bool(_READ_ONLY.search(text)) and not _ORDER_INTENT.search(text)
+
+
+def dispatch_request(text: str, pending: str | None, registry: SellerRegistry) -> str | None:
+    """The request to fan out to several sellers this turn, or None to leave the turn to the orchestrator.
+
+    Read-only requests fan out straight away. A multi-seller order first goes
+    to the orchestrator, which asks for confirmation while the order waits
+    in ``PENDING_KEY``; it fans out once the next turn confirms it.
+    """
+    if pending and _CONFIRMATION.match(text):
+        return pending
+    if is_read_only(text) and plan_dispatch(text, registry):
+        return text
+    return None
+
+
+def user_text(ctx: InvocationContext) -> str:
+    parts = ctx.user_content.parts if ctx.user_content else []
+    return " ".join(part.text for part in parts if part.text)
+
+
+class ParallelDispatchAgent(BaseAgent):
+    """Runs the remote sellers of a multi-intent request concurrently under one deadline.
+
+    Each seller runs in its own branch, like a ``ParallelAgent``, and its
+    events are passed through as they arrive so the seller conversations
+    stay in the session. Sellers still running when ``deadline_seconds``
+    is up are cancelled. The turn ends with a single merged event holding
+    every seller's outcome, as markdown for the user and as a structured
+    ``state_delta["last_dispatch"]``.
+
+    Only read-only and confirmed requests reach it (see ``dispatch_request``).
+    On a confirmation turn it first records the confirmed order as an event
+    of its own, which the sellers receive with the rest of the conversation.
+    """
+
+    registry: SellerRegistry
+    deadline_seconds: float = 60.0
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        root = self.parent_agent
+        text = user_text(ctx)
+        request = dispatch_request(text, ctx.session.state.get(PENDING_KEY), self.registry) or text
+        sellers = plan_dispatch(request, self.registry)
+        if request != text:
+            # The confirmation turn. RemoteA2aAgent builds its message from the session
+            # events since its last reply, so the confirmed order goes in as an event.
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part(text=f"The user confirmed this order: {request}")],
+                ),
+            )
+        results = {name: {"status": "pending", "text": ""} for name in sellers}
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def run_seller(name: str) -> None:
+            agent = root.ensure_seller(name)
+            branch = f"{ctx.branch}.{self.name}.{name}" if ctx.branch else f"{self.name}.{name}"
+            try:
+                async for event in agent.run_async(ctx.model_copy(update={"branch": branch})):
+                    await queue.put((name, event))
+            except Exception as e:
+                results[name] = {"status": "error", "text": str(e)}
+            finally:
+                await queue.put((name, None))
+
+        tasks = [asyncio.create_task(run_seller(name)) for name in sellers]
+        loop = asyncio.get_running_loop()
+        # Never wait past the request's own deadline
+        budget = remaining()
+        if budget is None or budget > self.deadline_seconds:
+            budget = self.deadline_seconds
+        deadline = loop.time() + budget
+        pending = set(sellers)
+        try:
+            while pending:
+                try:
+                    name, event = await asyncio.wait_for(queue.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    pending.discard(name)
+                    if results[name]["status"] == "pending":
+                        results[name]["status"] = "completed"
+                    continue
+                _record(results[name], event)
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+        for name in pending:
+            results[name]["status"] = "timeout"
+
+        lines = []
+        for name, result in results.items():
+            lines.append(f"## {name} ({result['status']})")
+            lines.append(result["text"] or "No response.")
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text="\n\n".join(lines))]),
+            actions=EventActions(state_delta={"last_dispatch": results, PENDING_KEY: None}),
+        )
+
+
+def _record(result: dict, event: Event) -> None:
+    if event.error_message:
+        result.update(status="error", text=event.error_message)
+        return
+    parts = event.content.parts if event.content and event.content.parts else []
+    text = "\n".join(part.text for part in parts if part.text and not part.thought)
+    if text and not event.partial:
+        result.update(status="completed", text=text)
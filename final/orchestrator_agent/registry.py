@@ -0,0 +1,150 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word tokens with a plural "s" stripped, so "pizzas" matches "pizza"."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class LexicalIndex:
+    """BM25 over seller cards, backed by an inverted index.
+
+    Scoring a query only walks the postings of its own terms, so lookup
+    cost depends on the query and the sellers that share its words, not on
+    how many sellers are registered.
+    """
+
+    def __init__(self, documents: dict[str, str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, list[tuple[str, int]]] = defaultdict(list)
+        self._lengths: dict[str, int] = {}
+        for doc_id, text in documents.items():
+            tokens = tokenize(text)
+            self._lengths[doc_id] = len(tokens)
+            for token, tf in Counter(tokens).items():
+                self._postings[token].append((doc_id, tf))
+        self._avg_length = sum(self._lengths.values()) / len(self._lengths) if self._lengths else 0.0
+
+    def search(self, query: str, k: int) -> list[tuple[str, float]]:
+        """Return up to ``k`` (doc_id, score) pairs with a positive score, best first."""
+        scores: dict[str, float] = defaultdict(float)
+        n = len(self._lengths)
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = 1 - self.b + self.b * self._lengths[doc_id] / self._avg_length
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class SellerRegistry:
+    """Remote sellers loaded from a JSON config file that is hot-reloaded on change.
+
+    The config is a list of sellers::
+
+        [{"name": "pizza_agent",
+          "description": "Sells pizzas",
+          "agent_card": "https://.../.well-known/agent.json",
+          "keywords": ["pizza", "margherita"],
+          "skills": ["Show the pizza menu", "Create pizza orders"]}]
+
+    The file's mtime is checked at most every ``reload_interval`` seconds.
+    Seller agents are built on demand by ``agent_factory`` and cached until
+    their entry changes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        agent_factory: Callable[[dict], object],
+        reload_interval: float = 5.0,
+    ):
+        self.path = path
+        self._agent_factory = agent_factory
+        self._reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._agents: dict[str, object] = {}
+        self._index = LexicalIndex({})
+        self._mtime: float | None = None
+        self._checked_at = 0.0
+        self.reload()
+
+    def reload(self) -> None:
+        """Re-read the config file and rebuild the index."""
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding="utf-8") as f:
+                entries = {entry["name"]: entry for entry in json.load(f)}
+            for name, agent in list(self._agents.items()):
+                if entries.get(name) != self._entries.get(name):
+                    del self._agents[name]
+            self._entries = entries
+            self._index = LexicalIndex({name: _card_text(entry) for name, entry in entries.items()})
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+
+    def maybe_reload(self) -> None:
+        if time.monotonic() - self._checked_at < self._reload_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            changed = os.path.getmtime(self.path) != self._mtime
+        except OSError:
+            return
+        if changed:
+            try:
+                self.reload()
+            except (OSError, ValueError, KeyError) as e:
+                # Keep serving the last good config
+                print(f"ERROR: Failed to reload seller registry {self.path}: {e}")
+
+    def get(self, name: str) -> dict | None:
+        return self._entries.get(name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def names(self) -> list[str]:
+        return list(self._entries)
+
+    def select(
+        self, text: str, k: int, include: tuple[str, ...] = (), min_score: float = 0.0
+    ) -> list[dict]:
+        """The ``k`` sellers most relevant to ``text``, plus any named in ``include``."""
+        self.maybe_reload()
+        names = [name for name, score in self._index.search(text, k) if score >= min_score]
+        names += [name for name in include if name and name not in names and name in self._entries]
+        return [self._entries[name] for name in names]
+
+    def agent(self, name: str):
+        """The agent for seller ``name``, built on first use."""
+        with self._lock:
+            if name not in self._agents:
+                self._agents[name] = self._agent_factory(self._entries[name])
+            return self._agents[name]
+
+
+def _card_text(entry: dict) -> str:
+    parts = [entry["name"].replace("_", " "), entry.get("description", "")]
+    parts += entry.get("keywords", [])
+    parts += entry.get("skills", [])
+    return " ".join(parts)
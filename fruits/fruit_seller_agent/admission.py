@@ -0,0 +1,245 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+# JSON-RPC methods that start model work; everything else passes straight through
+ADMITTED_METHODS = {"message/send", "message/stream"}
+
+
+class Rejected(Exception):
+    """Raised when a request cannot be admitted. Always retryable."""
+
+    def __init__(self, status: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def take(self) -> float:
+        """Take one token. Returns 0 on success, otherwise seconds until one is available."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class AdmissionController:
+    """Bounded concurrency with a fair per-context wait queue and a rate limit.
+
+    At most ``max_concurrency`` requests run at once. Requests beyond that
+    wait in one FIFO per ``contextId``, and freed slots are handed to the
+    contexts round-robin so a single chatty conversation cannot starve the
+    others. Requests are rejected immediately, with a retry-after hint,
+    when the token bucket is empty, the queue is full, or the expected wait
+    (from an EWMA of service time) exceeds ``max_wait``; a request that is
+    still queued after ``max_wait`` is rejected too.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        max_queue: int = 32,
+        max_wait: float = 10.0,
+        rate: float = 5.0,
+        burst: int = 10,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.bucket = TokenBucket(rate, burst)
+        self._in_flight = 0
+        self._queues: dict[str, deque[asyncio.Future]] = {}
+        self._ring: deque[str] = deque()
+        self._depth = 0
+        self._service_time = 2.0
+        self._waits: deque[float] = deque(maxlen=512)
+        self._counters = {"admitted": 0, "queued": 0, "rate_limited": 0, "queue_full": 0, "overloaded": 0, "queue_timeout": 0}
+
+    def estimated_wait(self) -> float:
+        return (self._depth + 1) / self.max_concurrency * self._service_time
+
+    async def acquire(self, context_id: str) -> None:
+        """Wait for a slot for ``context_id``; raises ``Rejected`` instead of waiting too long."""
+        retry_after = self.bucket.take()
+        if retry_after:
+            self._reject("rate_limited", 429, retry_after)
+        if self._in_flight < self.max_concurrency and not self._depth:
+            self._in_flight += 1
+            self._admitted(0.0)
+            return
+        if self._depth >= self.max_queue:
+            self._reject("queue_full", 503, self.estimated_wait())
+        if self.estimated_wait() > self.max_wait:
+            self._reject("overloaded", 503, self.estimated_wait())
+
+        waiter = asyncio.get_running_loop().create_future()
+        if context_id not in self._queues:
+            self._queues[context_id] = deque()
+            self._ring.append(context_id)
+        self._queues[context_id].append(waiter)
+        self._depth += 1
+        self._counters["queued"] += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait({waiter}, timeout=self.max_wait)
+        except BaseException:
+            # Cancelled while queued (e.g. client went away): give back a slot we were handed
+            if waiter.done() and not waiter.cancelled():
+                self._free()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+                self._dequeue(context_id, waiter)
+        if waiter.cancelled():
+            self._reject("queue_timeout", 503, self.estimated_wait())
+        self._admitted(time.monotonic() - start)
+
+    def release(self, service_seconds: float) -> None:
+        """Free a slot, handing it to the next context in round-robin order."""
+        self._service_time = 0.8 * self._service_time + 0.2 * service_seconds
+        self._free()
+
+    def _free(self) -> None:
+        while self._ring:
+            context_id = self._ring.popleft()
+            queue = self._queues[context_id]
+            waiter = queue.popleft()
+            self._depth -= 1
+            if queue:
+                self._ring.append(context_id)
+            else:
+                del self._queues[context_id]
+            if not waiter.done():
+                # The slot moves to the waiter; in-flight count is unchanged
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            **self._counters,
+            "in_flight": self._in_flight,
+            "queue_depth": self._depth,
+            "queued_contexts": len(self._queues),
+            "service_time_ewma_seconds": round(self._service_time, 3),
+            "wait_p50_seconds": round(waits[len(waits) // 2], 3) if waits else 0.0,
+            "wait_p95_seconds": round(waits[int(len(waits) * 0.95)], 3) if waits else 0.0,
+            "wait_max_seconds": round(waits[-1], 3) if waits else 0.0,
+        }
+
+    def _dequeue(self, context_id: str, waiter: asyncio.Future) -> None:
+        queue = self._queues.get(context_id)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self._depth -= 1
+        if not queue:
+            del self._queues[context_id]
+            self._ring.remove(context_id)
+
+    def _admitted(self, waited: float) -> None:
+        self._counters["admitted"] += 1
+        self._waits.append(waited)
+
+    def _reject(self, reason: str, status: int, retry_after: float):
+        self._counters[reason] += 1
+        raise Rejected(status, reason, retry_after)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware putting an ``AdmissionController`` in front of the A2A JSON-RPC endpoint.
+
+    Only ``message/send`` and ``message/stream`` calls are admitted through
+    the controller; agent card, task and feed requests are never queued.
+    Rejections are JSON-RPC errors with HTTP 429/503 and a ``Retry-After``
+    header.
+    """
+
+    def __init__(self, app, controller: AdmissionController, rpc_path: str = "/"):
+        self.app = app
+        self.controller = controller
+        self.rpc_path = rpc_path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.rpc_path:
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict) or payload.get("method") not in ADMITTED_METHODS:
+            await self.app(scope, replay, send)
+            return
+
+        message = (payload.get("params") or {}).get("message") or {}
+        context_id = message.get("contextId") or (scope.get("client") or ("anonymous",))[0]
+        try:
+            await self.controller.acquire(context_id)
+        except Rejected as e:
+            await self._reject(send, payload.get("id"), e)
+            return
+        start = time.monotonic()
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            self.controller.release(time.monotonic() - start)
+
+    async def _reject(self, send, request_id, e: Rejected) -> None:
+        retry_after = max(1, round(e.retry_after))
+        body = json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": -32000,
+                    "message": "Seller is busy, retry later",
+                    "data": {"reason": e.reason, "retryable": True, "retryAfter": retry_after},
+                },
+            }
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": e.status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
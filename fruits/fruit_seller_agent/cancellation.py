@@ -0,0 +1,160 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.events import EventQueue
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import (
+    AgentCapabilities,
+    Message,
+    Part,
+    Role,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
+from google.adk.a2a.utils.agent_card_builder import AgentCardBuilder
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.auth.credential_service.in_memory_credential_service import (
+    InMemoryCredentialService,
+)
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from starlette.applications import Starlette
+
+# Absolute Unix time (seconds) by which the caller needs an answer
+DEADLINE_HEADER = "x-request-deadline"
+
+# Stream model output to A2A clients as it is generated
+SELLER_STREAMING = os.getenv("SELLER_STREAMING", "true").lower() == "true"
+
+
+class StreamingRunner(Runner):
+    """Runner that always asks the model for SSE streaming.
+
+    ADK's A2A executor turns every partial event into a ``working`` status
+    update, so ``message/stream`` clients see the reply as it is written.
+    """
+
+    async def run_async(self, *, run_config: RunConfig | None = None, **kwargs):
+        run_config = (run_config or RunConfig()).model_copy(
+            update={"streaming_mode": StreamingMode.SSE}
+        )
+        async for event in super().run_async(run_config=run_config, **kwargs):
+            yield event
+
+
+class CancellableA2aAgentExecutor(A2aAgentExecutor):
+    """ADK's A2A executor with cancellation support.
+
+    ``tasks/cancel`` marks the task canceled, after which the request
+    handler cancels the running ``execute`` and with it the agent's model
+    and tool calls. A run that is still going when the caller's
+    ``X-Request-Deadline`` passes is stopped and marked canceled too, so no
+    work is spent on answers nobody will read.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._counts = {"cancelled": 0, "expired": 0}
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        deadline = asyncio.timeout(_remaining(context))
+        try:
+            async with deadline:
+                await super().execute(context, event_queue)
+        except TimeoutError:
+            # Only our deadline; a timeout raised by a tool or the model client is a failure
+            if not deadline.expired():
+                raise
+            self._counts["expired"] += 1
+            await _publish_canceled(
+                context, event_queue, "The request deadline passed before the task finished."
+            )
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        # The request handler cancels the running execute() once this returns
+        self._counts["cancelled"] += 1
+        await _publish_canceled(context, event_queue, "The task was cancelled by the caller.")
+
+    def stats(self) -> dict:
+        return dict(self._counts)
+
+
+def to_cancellable_a2a(
+    agent: BaseAgent, *, host: str = "localhost", port: int = 8000, protocol: str = "http"
+) -> tuple[Starlette, CancellableA2aAgentExecutor]:
+    """Like ADK's ``to_a2a``, but served by ``CancellableA2aAgentExecutor``.
+
+    The agent card advertises streaming, and unless ``SELLER_STREAMING`` is
+    off the model streams too. Like ``to_a2a``, the A2A routes are added when
+    the returned app starts.
+    """
+
+    async def create_runner() -> Runner:
+        runner_class = StreamingRunner if SELLER_STREAMING else Runner
+        return runner_class(
+            app_name=agent.name or "adk_agent",
+            agent=agent,
+            artifact_service=InMemoryArtifactService(),
+            session_service=InMemorySessionService(),
+            memory_service=InMemoryMemoryService(),
+            credential_service=InMemoryCredentialService(),
+        )
+
+    executor = CancellableA2aAgentExecutor(runner=create_runner)
+    request_handler = DefaultRequestHandler(
+        agent_executor=executor, task_store=InMemoryTaskStore()
+    )
+    card_builder = AgentCardBuilder(
+        agent=agent,
+        rpc_url=f"{protocol}://{host}:{port}/",
+        capabilities=AgentCapabilities(streaming=True),
+    )
+    app = Starlette()
+
+    async def setup_a2a() -> None:
+        a2a_app = A2AStarletteApplication(
+            agent_card=await card_builder.build(), http_handler=request_handler
+        )
+        a2a_app.add_routes_to_app(app)
+
+    app.add_event_handler("startup", setup_a2a)
+    return app, executor
+
+
+def _remaining(context: RequestContext) -> float | None:
+    headers = context.call_context.state.get("headers", {}) if context.call_context else {}
+    try:
+        return float(headers[DEADLINE_HEADER]) - time.time()
+    except (KeyError, ValueError):
+        return None
+
+
+async def _publish_canceled(context: RequestContext, event_queue: EventQueue, reason: str) -> None:
+    await event_queue.enqueue_event(
+        TaskStatusUpdateEvent(
+            task_id=context.task_id,
+            context_id=context.context_id,
+            status=TaskStatus(
+                state=TaskState.canceled,
+                timestamp=datetime.now(timezone.utc).isoformat(),
+                message=Message(
+                    message_id=str(uuid.uuid4()),
+                    role=Role.agent,
+                    parts=[Part(root=TextPart(text=reason))],
+                ),
+            ),
+            final=True,
+        )
+    )
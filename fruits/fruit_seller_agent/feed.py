@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from .inventory import Inventory
+
+HEARTBEAT_SECONDS = 15.0
+MAX_POLL_SECONDS = 30.0
+
+
+class ChangeFeed:
+    """Bounded replay buffer of inventory changes for SSE and long-poll subscribers.
+
+    Changes are numbered by the inventory version, so sequence numbers are
+    contiguous and monotonic within a process. ``epoch`` changes on every
+    restart; a subscriber whose epoch does not match, or whose cursor has
+    fallen out of the buffer, has to resync from a snapshot.
+    """
+
+    def __init__(self, inventory: Inventory, capacity: int = 1024):
+        self.inventory = inventory
+        self.epoch = uuid.uuid4().hex[:12]
+        self._buffer: deque[dict] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        inventory.subscribe(self.publish)
+
+    def publish(self, change: dict) -> None:
+        # Mutations may come from tool threads, so wake waiters on their own loops
+        with self._lock:
+            self._buffer.append(change)
+            waiters, self._waiters = self._waiters, set()
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def since(self, seq: int, epoch: str | None = None) -> list[dict] | None:
+        """Changes after ``seq``, or None when the subscriber must resync from a snapshot."""
+        with self._lock:
+            latest = self._buffer[-1]["seq"] if self._buffer else self.inventory.version
+            if epoch != self.epoch or seq > latest:
+                return None
+            oldest = self._buffer[0]["seq"] if self._buffer else latest + 1
+            if seq < oldest - 1:
+                return None
+            return [change for change in self._buffer if change["seq"] > seq]
+
+    async def wait(self, seq: int, epoch: str | None, timeout: float) -> list[dict] | None:
+        """Like ``since`` but waits up to ``timeout`` seconds for at least one change."""
+        deadline = time.monotonic() + timeout
+        while True:
+            waiter = (asyncio.get_running_loop(), asyncio.Event())
+            with self._lock:
+                self._waiters.add(waiter)
+            try:
+                changes = self.since(seq, epoch)
+                remaining = deadline - time.monotonic()
+                if changes is None or changes or remaining <= 0:
+                    return changes
+                await asyncio.wait_for(waiter[1].wait(), remaining)
+            except asyncio.TimeoutError:
+                return self.since(seq, epoch)
+            finally:
+                with self._lock:
+                    self._waiters.discard(waiter)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "epoch": self.epoch,
+                "buffered": len(self._buffer),
+                "capacity": self._buffer.maxlen,
+                "subscribers_waiting": len(self._waiters),
+            }
+
+
+def _cursor(request: Request) -> tuple[int, str | None]:
+    # SSE reconnects send back the last event id as "<epoch>:<seq>"
+    last_event_id = request.headers.get("last-event-id", "")
+    if ":" in last_event_id:
+        epoch, _, seq = last_event_id.partition(":")
+        return int(seq), epoch
+    return int(request.query_params.get("since", "-1")), request.query_params.get("epoch")
+
+
+def _sse(event: str, data: dict, event_id: str | None = None) -> str:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def feed_routes(feed: ChangeFeed) -> list[Route]:
+    """Routes for the inventory snapshot and its change feed.
+
+    * ``GET /inventory`` returns the snapshot with an ETag and honours
+      ``If-None-Match`` with a 304.
+    * ``GET /inventory/changes?since=<seq>&epoch=<epoch>`` streams changes as
+      server-sent events when the client accepts ``text/event-stream``, and
+      otherwise long-polls for up to ``wait`` seconds and returns JSON. A
+      subscriber that cannot be caught up from the buffer gets a snapshot.
+    """
+
+    async def snapshot(request: Request) -> Response:
+        body = {"epoch": feed.epoch, **feed.inventory.snapshot()}
+        headers = {"ETag": body["etag"], "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == body["etag"]:
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(body, headers=headers)
+
+    async def changes(request: Request) -> Response:
+        seq, epoch = _cursor(request)
+        if "text/event-stream" in request.headers.get("accept", ""):
+            return StreamingResponse(
+                _stream(request, seq, epoch),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+        wait = min(float(request.query_params.get("wait", "25")), MAX_POLL_SECONDS)
+        pending = await feed.wait(seq, epoch, wait)
+        if pending is None:
+            return JSONResponse({"epoch": feed.epoch, "snapshot": feed.inventory.snapshot()})
+        return JSONResponse({"epoch": feed.epoch, "changes": pending})
+
+    async def _stream(request: Request, seq: int, epoch: str | None):
+        while not await request.is_disconnected():
+            pending = await feed.wait(seq, epoch, HEARTBEAT_SECONDS)
+            if pending is None:
+                state = feed.inventory.snapshot()
+                epoch, seq = feed.epoch, state["version"]
+                yield _sse("snapshot", {"epoch": epoch, **state}, f"{epoch}:{seq}")
+            elif not pending:
+                yield ": heartbeat\n\n"
+            for change in pending or ():
+                seq = change["seq"]
+                yield _sse("change", change, f"{epoch}:{seq}")
+
+    return [
+        Route("/inventory", snapshot, methods=["GET"]),
+        Route("/inventory/changes", changes, methods=["GET"]),
+    ]
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import threading
+from typing import Callable, NamedTuple
+
+
+class Catalog(NamedTuple):
+    """A rendered price list together with the inventory version it reflects."""
+
+    text: str
+    version: int
+    etag: str
+
+
+class Inventory:
+    """In-memory stock book with a cached, versioned catalog rendering.
+
+    Every stock, price or hold mutation bumps ``version`` and drops the
+    cached rendering, so repeated ``render()`` calls between mutations are
+    free. The ETag is a digest of the item data, which keeps it stable
+    across restarts as long as the stock book itself is unchanged.
+
+    Units can be put on hold for a pending purchase; held units stay in
+    ``stock`` but are no longer ``available`` to other buyers.
+
+    Subscribers registered with ``subscribe`` receive one change per
+    mutation, carrying the new ``version`` as its sequence number. They are
+    called with the inventory lock held and must not block.
+    """
+
+    def __init__(self, items: dict[str, dict], separator: str = ", "):
+        self._items = {name: dict(data) for name, data in items.items()}
+        self._separator = separator
+        self._lock = threading.RLock()
+        self._held = {name: 0 for name in self._items}
+        self._catalog: Catalog | None = None
+        self._subscribers: list[Callable[[dict], None]] = []
+        self.version = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._items
+
+    def price(self, name: str) -> int:
+        return self._items[name]["price"]
+
+    def stock(self, name: str) -> int:
+        return self._items[name]["stock"]
+
+    def available(self, name: str) -> int:
+        """Units in stock that are not on hold."""
+        return self._items[name]["stock"] - self._held[name]
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        self._subscribers.append(callback)
+
+    def snapshot(self) -> dict:
+        """Every item with its price, stock and available units, plus the version and ETag."""
+        with self._lock:
+            catalog = self.render()
+            return {
+                "version": catalog.version,
+                "etag": catalog.etag,
+                "items": {name: self._item_state(name) for name in self._items},
+            }
+
+    def render(self) -> Catalog:
+        """Return the formatted price list, rebuilding it only after a mutation."""
+        with self._lock:
+            if self._catalog is None:
+                text = self._separator.join(
+                    f"{name.capitalize()}: ₹{data['price']}"
+                    for name, data in self._items.items()
+                )
+                digest = hashlib.sha1(
+                    json.dumps([self._items, self._held], sort_keys=True).encode()
+                ).hexdigest()[:16]
+                self._catalog = Catalog(text, self.version, f'"{digest}"')
+            return self._catalog
+
+    def buy(self, name: str, quantity: int) -> bool:
+        """Take ``quantity`` out of stock. Returns False when there is not enough."""
+        _check_quantity(quantity)
+        with self._lock:
+            if self.available(name) < quantity:
+                return False
+            self._items[name]["stock"] -= quantity
+            self._mutated(name)
+            return True
+
+    def hold(self, name: str, quantity: int) -> bool:
+        """Put ``quantity`` available units on hold. Returns False when there is not enough."""
+        _check_quantity(quantity)
+        with self._lock:
+            if self.available(name) < quantity:
+                return False
+            self._held[name] += quantity
+            self._mutated(name)
+            return True
+
+    def unhold(self, name: str, quantity: int) -> None:
+        """Return held units to the available pool."""
+        with self._lock:
+            self._held[name] -= quantity
+            self._mutated(name)
+
+    def commit(self, name: str, quantity: int) -> None:
+        """Sell units that are currently on hold."""
+        with self._lock:
+            self._held[name] -= quantity
+            self._items[name]["stock"] -= quantity
+            self._mutated(name)
+
+    def restock(self, name: str, quantity: int) -> None:
+        with self._lock:
+            self._items[name]["stock"] += quantity
+            self._mutated(name)
+
+    def set_price(self, name: str, price: int) -> None:
+        with self._lock:
+            self._items[name]["price"] = price
+            self._mutated(name)
+
+    def _item_state(self, name: str) -> dict:
+        return {**self._items[name], "available": self.available(name)}
+
+    def _mutated(self, name: str) -> None:
+        self.version += 1
+        self._catalog = None
+        change = {"seq": self.version, "item": name, **self._item_state(name)}
+        for callback in self._subscribers:
+            callback(change)
+
+
+def _check_quantity(quantity: int) -> None:
+    # A zero or negative quantity would pass the stock check and inflate what is available
+    if quantity <= 0:
+        raise ValueError(f"Quantity must be positive, got {quantity}")
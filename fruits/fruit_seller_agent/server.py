@@ -1,5 +1,151 @@
+"""Seller launcher.
+
+Binds the port straight away and builds the agent in the background, so
+``/healthz`` answers within milliseconds of the process starting while
+``/readyz`` stays 503 until the agent card and model client are warm.
+Point the platform's startup/readiness probe at ``/readyz``.
+
+Configuration (environment):
+    PORT / SELLER_PORT      port to listen on (PORT wins, as set by Cloud Run)
+    SELLER_HOST             interface to bind and advertise in the agent card
+    SELLER_WORKERS          uvicorn worker processes; the inventory lives in
+                            process memory, so keep this at 1 unless sharded
+    SELLER_WARM_MODEL_CALL  "true" to send one tiny model request during warm-up
+    SELLER_COLD_START_BUDGET_MS  warn when warm-up exceeds this budget
+"""
+
+import time
+
+_LAUNCHER_START = time.perf_counter()
+
+import asyncio
+import importlib
+import json
+import logging
+import os
+import sys
+
 import uvicorn
-from agent import a2a_app
+
+# Import through the package so the agent's relative imports resolve
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PACKAGE = "fruit_seller_agent"
+DEFAULT_PORT = 8002
+
+HOST = os.getenv("SELLER_HOST", "127.0.0.1")
+PORT = int(os.getenv("PORT") or os.getenv("SELLER_PORT") or DEFAULT_PORT)
+WORKERS = int(os.getenv("SELLER_WORKERS", "1"))
+WARM_MODEL_CALL = os.getenv("SELLER_WARM_MODEL_CALL", "false").lower() == "true"
+COLD_START_BUDGET_MS = float(os.getenv("SELLER_COLD_START_BUDGET_MS", "5000"))
+
+logger = logging.getLogger(__name__)
+
+
+class SellerLauncher:
+    """ASGI app serving health probes and forwarding to the seller once it is warm."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.app = None
+        self.ready = False
+        self.error: str | None = None
+        self.timings_ms: dict[str, float] = {
+            "launcher_import": round((time.perf_counter() - _LAUNCHER_START) * 1000, 1)
+        }
+        self._inner = None
+        self._warm_task: asyncio.Task | None = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http" and scope["path"] == "/healthz":
+            await _json(send, 200, {"status": "ok"})
+        elif scope["type"] == "http" and scope["path"] == "/readyz":
+            body = {"ready": self.ready, "timings_ms": self.timings_ms}
+            if self.error:
+                body["error"] = self.error
+            await _json(send, 200 if self.ready else 503, body)
+        elif self.ready:
+            await self.app(scope, receive, send)
+        elif scope["type"] == "http":
+            await _json(send, 503, {"error": "warming up"}, [(b"retry-after", b"1")])
+
+    async def warm_up(self) -> None:
+        """Import and build the agent app, start it, and construct the model client."""
+        started = time.perf_counter()
+
+        def lap(name: str) -> None:
+            nonlocal started
+            now = time.perf_counter()
+            self.timings_ms[name] = round((now - started) * 1000, 1)
+            started = now
+
+        try:
+            agent = importlib.import_module(f"{PACKAGE}.agent")
+            admission = importlib.import_module(f"{PACKAGE}.admission")
+            lap("import_agent")
+            self._inner = agent.build_a2a_app(host=self.host, port=self.port)
+            self.app = admission.AdmissionMiddleware(self._inner, agent.admission)
+            lap("build_app")
+            # Runs the A2A startup hooks: agent card build, routes, hold sweeper
+            await self._inner.router.startup()
+            lap("agent_card")
+            model = agent.root_agent.canonical_model
+            model.api_client  # builds and caches the google-genai client
+            if WARM_MODEL_CALL:
+                await model.api_client.aio.models.generate_content(
+                    model=model.model, contents="ping"
+                )
+            lap("model_client")
+        except Exception as e:
+            self.error = repr(e)
+            logger.exception("Seller warm-up failed")
+            return
+        total = sum(self.timings_ms.values())
+        self.timings_ms["total"] = round(total, 1)
+        self.ready = True
+        logger.info("Seller ready in %.0f ms: %s", total, json.dumps(self.timings_ms))
+        if total > COLD_START_BUDGET_MS:
+            logger.warning(
+                "Cold start took %.0f ms, over the %.0f ms budget", total, COLD_START_BUDGET_MS
+            )
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._warm_task = asyncio.create_task(self.warm_up())
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.ready = False
+                if self._warm_task is not None and not self._warm_task.done():
+                    self._warm_task.cancel()
+                if self._inner is not None:
+                    await self._inner.router.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _json(send, status: int, body: dict, headers: list | None = None) -> None:
+    payload = json.dumps(body).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), *(headers or [])],
+        }
+    )
+    await send({"type": "http.response.body", "body": payload})
+
+
+app = SellerLauncher(HOST, PORT)
 
 if __name__ == "__main__":
-    uvicorn.run(a2a_app, host="127.0.0.1", port=8002)
+    logging.basicConfig(level=logging.INFO)
+    if WORKERS > 1:
+        logger.warning("Running %d workers: each keeps its own in-memory inventory", WORKERS)
+        uvicorn.run(f"{PACKAGE}.server:app", host=HOST, port=PORT, workers=WORKERS)
+    else:
+        uvicorn.run(app, host=HOST, port=PORT)
@@ -4,9 +4,11 @@ import os
 
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
-root_agent = PurchasingAgent(
+# Kept so the app lifespan can warm it up and drain it
+purchasing_agent = PurchasingAgent(
     remote_agent_addresses=[
         os.getenv("PIZZA_SELLER_AGENT_URL", "http://localhost:10000"),
         os.getenv("BURGER_SELLER_AGENT_URL", "http://localhost:10001"),
     ]
-).create_agent()
+)
+root_agent = purchasing_agent.create_agent()
@@ -0,0 +1,95 @@
+import contextvars
+import os
+import time
+
+import httpx
+
+# Absolute Unix time (seconds) by which the caller needs an answer
+DEADLINE_HEADER = "X-Request-Deadline"
+# Relative budget in seconds, for callers that would rather not trust our clock
+TIMEOUT_HEADER = "X-Request-Timeout"
+
+REQUEST_BUDGET_SECONDS = float(os.getenv("REQUEST_BUDGET_SECONDS", "60"))
+
+# (deadline, scope): the scope is None for a deadline set by DeadlineMiddleware,
+# or the invocation that started a default budget
+_deadline: contextvars.ContextVar[tuple[float, str | None] | None] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+def get_deadline() -> float | None:
+    current = _deadline.get()
+    return current[0] if current else None
+
+
+def ensure_deadline(scope: str | None = None, budget_seconds: float = REQUEST_BUDGET_SECONDS) -> float:
+    """The current request's deadline, starting a ``budget_seconds`` one if there is none.
+
+    A default budget belongs to ``scope`` (an invocation id), so a later
+    invocation running in the same context starts a fresh one instead of
+    inheriting an expired deadline.
+    """
+    current = _deadline.get()
+    if current is None or (current[1] is not None and current[1] != scope):
+        current = (time.time() + budget_seconds, scope)
+        _deadline.set(current)
+    return current[0]
+
+
+def remaining(deadline: float | None = None) -> float | None:
+    """Seconds left before ``deadline`` (default: the current request's), never negative."""
+    if deadline is None:
+        deadline = get_deadline()
+    return None if deadline is None else max(0.0, deadline - time.time())
+
+
+def deadline_headers(deadline: float) -> dict[str, str]:
+    return {DEADLINE_HEADER: f"{deadline:.3f}"}
+
+
+def parse_deadline(headers) -> float | None:
+    """The deadline asked for by an incoming request's headers, if any."""
+    try:
+        if headers.get(DEADLINE_HEADER.lower()):
+            return float(headers[DEADLINE_HEADER.lower()])
+        if headers.get(TIMEOUT_HEADER.lower()):
+            return time.time() + float(headers[TIMEOUT_HEADER.lower()])
+    except ValueError:
+        pass
+    return None
+
+
+async def propagate_deadline(request: httpx.Request) -> None:
+    """httpx request hook: send the remaining budget along and use it as the timeout."""
+    deadline = get_deadline()
+    if deadline is None:
+        return
+    request.headers.update(deadline_headers(deadline))
+    request.extensions["timeout"] = httpx.Timeout(max(remaining(deadline), 0.001)).as_dict()
+
+
+class DeadlineMiddleware:
+    """ASGI middleware giving every HTTP request a deadline.
+
+    The deadline comes from the ``X-Request-Deadline`` or ``X-Request-Timeout``
+    header, or defaults to ``budget_seconds`` from now. It is held in a
+    context variable for the rest of the request, so agents and tools reach
+    it through ``remaining()`` and outgoing calls carry it forward.
+    """
+
+    def __init__(self, app, budget_seconds: float = REQUEST_BUDGET_SECONDS):
+        self.app = app
+        self.budget_seconds = budget_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        deadline = parse_deadline(headers) or time.time() + self.budget_seconds
+        token = _deadline.set((deadline, None))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
@@ -14,7 +14,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import asyncio
 import json
+import os
 import uuid
 from typing import List
 import httpx
@@ -23,7 +25,14 @@ from google.adk import Agent
 from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.tools.tool_context import ToolContext
-from .remote_agent_connection import RemoteAgentConnections, TaskUpdateCallback
+from google.genai import types
+from .catalog_mirror import CatalogMirror
+from .context_window import ContextWindow
+from .deadline import ensure_deadline, remaining
+from .model_tier import ModelRouter
+from .progress import bus, partial_event
+from .prompt_cache import PromptCache
+from .remote_agent_connection import RemoteAgentConnections, TaskCallbackArg, TaskUpdateCallback
 
 from a2a.client import A2ACardResolver
 from a2a.types import (
@@ -34,6 +43,7 @@ from a2a.types import (
     SendMessageResponse,
     SendMessageSuccessResponse,
     Task,
+    TaskStatusUpdateEvent,
 )
 
 
@@ -53,26 +63,60 @@ class PurchasingAgent:
         self.cards: dict[str, AgentCard] = {}
         self.agents = ""
         self.a2a_client_init_status = False
+        self.catalog_mirrors: dict[str, CatalogMirror] = {}
+        self.mirror_catalogs = os.getenv("CATALOG_MIRROR", "false").lower() == "true"
+        self.context_window = ContextWindow(
+            keep_turns=int(os.getenv("CONTEXT_KEEP_TURNS", "6")),
+            summary_chars=int(os.getenv("CONTEXT_SUMMARY_CHARS", "4000")),
+        )
+        self.prompt_cache = (
+            PromptCache(ttl_seconds=int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600")))
+            if os.getenv("GEMINI_CONTEXT_CACHE", "false").lower() == "true"
+            else None
+        )
+        # Cheap turns go to the first model, harder ones and retries climb the ladder
+        self.model_router = ModelRouter.from_env("gemini-2.5-flash-lite,gemini-2.5-flash")
+        self._static_instruction = ""
+        self._static_key = None
+        self._discovery_lock = asyncio.Lock()
+        self._discovery_client: httpx.AsyncClient | None = None
+        # In-flight send_task calls, drained on shutdown
+        self.accepting = True
+        self._inflight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
 
     def create_agent(self) -> Agent:
+        tools = [self.send_task]
+        if self.mirror_catalogs:
+            tools.append(self.check_catalog)
         return Agent(
-            model="gemini-2.5-flash-lite",
+            model=self.model_router.ladder[0],
             name="purchasing_agent",
             instruction=self.root_instruction,
             before_model_callback=self.before_model_callback,
+            after_model_callback=self.model_router.after_model,
+            after_tool_callback=self.model_router.after_tool,
             before_agent_callback=self.before_agent_callback,
             description=(
                 "This purchasing agent orchestrates the decomposition of the user purchase request into"
                 " tasks that can be performed by the seller agents."
             ),
-            tools=[
-                self.send_task,
-            ],
+            tools=tools,
         )
 
     def root_instruction(self, context: ReadonlyContext) -> str:
-        current_agent = self.check_active_agent(context)
-        return f"""You are an expert purchasing delegator that can delegate the user product inquiry and purchase request to the
+        # Byte-stable so the provider can cache it; per-turn state is added in before_model_callback
+        return self.static_instruction()
+
+    def static_instruction(self) -> str:
+        """The instructions plus agent catalog, rebuilt only when the card set changes."""
+        key = tuple(sorted((card.name, card.description or "") for card in self.cards.values()))
+        if key != self._static_key:
+            self.agents = "\n".join(
+                json.dumps(ra, sort_keys=True) for ra in self.list_remote_agents()
+            )
+            self._static_instruction = f"""You are an expert purchasing delegator that can delegate the user product inquiry and purchase request to the
 appropriate seller remote agents.
 
 Execution:
@@ -86,17 +130,20 @@ Execution:
 - If the user already confirmed the related order in the past conversation history, you can confirm on behalf of the user
 - Do not give irrelevant context to remote seller agent. For example, ordered pizza item is not relevant for the burger seller agent
 - Never ask order confirmation to the remote seller agent 
+- For price or stock questions, try `check_catalog` first when it is available; it answers from a local copy of the seller inventory without contacting the seller. Fall back to `send_task` if it has no data.
 
 Please rely on tools to address the request, and don't make up the response. If you are not sure, please ask the user for more details.
-Focus on the most recent parts of the conversation primarily.
+Focus on the most recent parts of the conversation primarily. Older turns may be given as a summary at the start of the conversation.
 
 If there is an active agent, send the request to that agent with the update task tool.
 
+The current active seller agent is given at the end of the conversation.
+
 Agents:
 {self.agents}
-
-Current active seller agent: {current_agent["active_agent"]}
 """
+            self._static_key = key
+        return self._static_instruction
 
     def check_active_agent(self, context: ReadonlyContext):
         state = context.state
@@ -110,7 +157,15 @@ Current active seller agent: {current_agent["active_agent"]}
         return {"active_agent": "None"}
 
     async def before_agent_callback(self, callback_context: CallbackContext):
-        if not self.a2a_client_init_status:
+        # Tool calls of this run share one budget unless the request brought its own
+        ensure_deadline(callback_context.invocation_id)
+        await self.discover()
+
+    async def discover(self):
+        """Resolve the seller agent cards and set up a connection to each seller, once."""
+        async with self._discovery_lock:
+            if self.a2a_client_init_status:
+                return
             # Use Google Cloud authentication for service-to-service calls
             import google.auth
             
@@ -118,7 +173,7 @@ Current active seller agent: {current_agent["active_agent"]}
             credentials, _ = google.auth.default()
             
             # Create authenticated HTTP client
-            httpx_client = httpx.AsyncClient(timeout=30)
+            httpx_client = self._discovery_client = httpx.AsyncClient(timeout=30)
             
             for address in self.remote_agent_addresses:
                 card_resolver = A2ACardResolver(
@@ -135,14 +190,47 @@ Current active seller agent: {current_agent["active_agent"]}
                     )
                     self.remote_agent_connections[card.name] = remote_connection
                     self.cards[card.name] = card
+                    print(f"Found agent card: {card.model_dump()}")
+                    print("=" * 100)
+                    if self.mirror_catalogs:
+                        mirror = CatalogMirror(
+                            card.url, remote_connection.get_httpx_client()
+                        )
+                        mirror.start()
+                        self.catalog_mirrors[card.name] = mirror
                 except httpx.ConnectError:
                     print(f"ERROR: Failed to get agent card from : {address}")
-            agent_info = []
-            for ra in self.list_remote_agents():
-                agent_info.append(json.dumps(ra))
-            self.agents = "\n".join(agent_info)
             self.a2a_client_init_status = True
 
+    async def warm_up(self):
+        """Resolve cards, prime credentials and open a pooled connection to every seller."""
+        await self.discover()
+        await asyncio.gather(
+            *(connection.warm_up() for connection in self.remote_agent_connections.values())
+        )
+
+    async def drain(self, grace_seconds: float) -> int:
+        """Refuse new ``send_task`` calls and wait up to ``grace_seconds`` for running ones.
+
+        Returns:
+            The number of calls still running when the grace period ended.
+        """
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self._idle.wait(), grace_seconds)
+        except TimeoutError:
+            pass
+        return self._inflight
+
+    async def aclose(self):
+        """Stop the catalog mirrors and close every HTTP client."""
+        for mirror in self.catalog_mirrors.values():
+            await mirror.stop()
+        for connection in self.remote_agent_connections.values():
+            await connection.aclose()
+        if self._discovery_client is not None:
+            await self._discovery_client.aclose()
+
     async def before_model_callback(
         self, callback_context: CallbackContext, llm_request
     ):
@@ -151,6 +239,24 @@ Current active seller agent: {current_agent["active_agent"]}
             if "session_id" not in state:
                 state["session_id"] = str(uuid.uuid4())
             state["session_active"] = True
+        self.context_window.apply(callback_context, llm_request)
+        self.model_router.before_model(callback_context, llm_request)
+        # Dynamic state goes last so everything before it stays cacheable. It
+        # rides on the latest user turn rather than a turn the user never sent;
+        # tool results are role "user" too, but are not the user's turn.
+        current_agent = self.check_active_agent(callback_context)
+        note = types.Part(text=f"Current active seller agent: {current_agent['active_agent']}")
+        for index in range(len(llm_request.contents) - 1, -1, -1):
+            content = llm_request.contents[index]
+            parts = content.parts or []
+            if content.role == "user" and not any(part.function_response for part in parts):
+                # A copy, so the note never leaks into the session history
+                llm_request.contents[index] = content.model_copy(
+                    update={"parts": [*parts, note]}
+                )
+                break
+        if self.prompt_cache is not None:
+            await self.prompt_cache.apply(llm_request)
 
     def list_remote_agents(self):
         """List the available remote agents you can use to delegate the task."""
@@ -158,14 +264,29 @@ Current active seller agent: {current_agent["active_agent"]}
             return []
 
         remote_agent_info = []
-        for card in self.cards.values():
-            print(f"Found agent card: {card.model_dump()}")
-            print("=" * 100)
+        for card in sorted(self.cards.values(), key=lambda card: card.name):
             remote_agent_info.append(
                 {"name": card.name, "description": card.description}
             )
         return remote_agent_info
 
+    def check_catalog(self, agent_name: str):
+        """Looks up a seller's current prices and stock from the local catalog mirror
+
+        Args:
+            agent_name: The name of the seller agent whose catalog to read.
+
+        Returns:
+            The seller's items with price, stock and available units, or a
+            message saying the local copy cannot be used.
+        """
+        mirror = self.catalog_mirrors.get(agent_name)
+        if mirror is None or not mirror.supported:
+            return f"No local catalog for {agent_name}. Use send_task instead."
+        if not mirror.fresh:
+            return f"The local catalog for {agent_name} is not in sync. Use send_task instead."
+        return {"agent": agent_name, "version": mirror.version, "items": mirror.items}
+
     async def send_task(self, agent_name: str, task: str, tool_context: ToolContext):
         """Sends a task to remote seller agent
 
@@ -182,12 +303,18 @@ Current active seller agent: {current_agent["active_agent"]}
         """
         if agent_name not in self.remote_agent_connections:
             raise ValueError(f"Agent {agent_name} not found")
+        if not self.accepting:
+            return f"The purchasing agent is shutting down; {agent_name} was not contacted."
         state = tool_context.state
         state["active_agent"] = agent_name
         client = self.remote_agent_connections[agent_name]
         if not client:
             raise ValueError(f"Client not available for {agent_name}")
         session_id = state["session_id"]
+        # The seller gets whatever is left of this request's budget
+        deadline = ensure_deadline(tool_context.invocation_id)
+        if not remaining(deadline):
+            return f"The request deadline has passed; {agent_name} was not contacted."
         task: Task
         message_id = ""
         metadata = {}
@@ -212,9 +339,20 @@ Current active seller agent: {current_agent["active_agent"]}
         message_request = SendMessageRequest(
             id=message_id, params=MessageSendParams.model_validate(payload)
         )
-        send_response: SendMessageResponse = await client.send_message(
-            message_request=message_request
-        )
+        self._inflight += 1
+        self._idle.clear()
+        try:
+            send_response: SendMessageResponse = await client.send_message(
+                message_request=message_request,
+                deadline=deadline,
+                task_callback=self.forward_progress(tool_context),
+            )
+        except TimeoutError:
+            return f"{agent_name} did not answer before the request deadline; the task was cancelled."
+        finally:
+            self._inflight -= 1
+            if not self._inflight:
+                self._idle.set()
         print(
             "send_response",
             send_response.model_dump_json(exclude_none=True, indent=2),
@@ -230,6 +368,35 @@ Current active seller agent: {current_agent["active_agent"]}
 
         return send_response.root.result
 
+    def forward_progress(self, tool_context: ToolContext):
+        """Task callback that streams a seller's status updates to the user's ``/run_sse``."""
+        session_id = tool_context.session.id
+        streamed = ""
+
+        def forward(update: TaskCallbackArg, card: AgentCard) -> None:
+            nonlocal streamed
+            if not isinstance(update, TaskStatusUpdateEvent):
+                return
+            message = update.status.message
+            text = "".join(
+                p.root.text for p in (message.parts if message else []) if p.root.kind == "text"
+            )
+            # The seller repeats its whole reply once it is done; that is already streamed
+            if text == streamed:
+                text = ""
+            streamed += text
+            bus.publish(
+                session_id,
+                partial_event(
+                    tool_context.agent_name,
+                    tool_context.invocation_id,
+                    text,
+                    {"seller": card.name, "a2a_state": update.status.state.value},
+                ),
+            )
+
+        return forward
+
 
 def convert_parts(parts: list[Part], tool_context: ToolContext):
     rval = []
@@ -1,20 +1,40 @@
+import asyncio
+import uuid
 from typing import Callable
 import httpx
 from a2a.client import A2AClient
 from a2a.types import (
     AgentCard,
+    CancelTaskRequest,
+    InternalError,
+    JSONRPCErrorResponse,
+    Message,
     SendMessageRequest,
     SendMessageResponse,
+    SendMessageSuccessResponse,
+    SendStreamingMessageRequest,
+    SendStreamingMessageSuccessResponse,
     Task,
     TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskState,
+    TaskStatus,
     TaskStatusUpdateEvent,
 )
+from a2a.utils import append_artifact_to_task
 from google.auth import default
 import httpx
 
+from .deadline import deadline_headers, remaining
+
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 
+# A task in one of these states is still using the seller's resources
+RUNNING_STATES = {TaskState.submitted, TaskState.working}
+CANCEL_TIMEOUT_SECONDS = 5
+AGENT_CARD_PATH = "/.well-known/agent.json"
+
 
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
@@ -37,11 +57,107 @@ class RemoteAgentConnections:
         self._httpx_client = httpx.AsyncClient(timeout=30, headers=headers)
         self.agent_client = A2AClient(self._httpx_client, agent_card, url=agent_url)
         self.card = agent_card
+        self._pending_cancels: set[asyncio.Task] = set()
 
     def get_agent(self) -> AgentCard:
         return self.card
 
+    def get_httpx_client(self) -> httpx.AsyncClient:
+        return self._httpx_client
+
+    async def warm_up(self) -> None:
+        """Open a pooled connection (TCP and TLS) to the seller before the first task."""
+        try:
+            await self._httpx_client.get(self.card.url.rstrip("/") + AGENT_CARD_PATH)
+        except httpx.HTTPError as e:
+            print(f"ERROR: Failed to warm up connection to {self.card.name}: {e}")
+
+    async def aclose(self) -> None:
+        """Let pending task cancellations finish, then close the HTTP client."""
+        if self._pending_cancels:
+            await asyncio.gather(*self._pending_cancels, return_exceptions=True)
+        await self._httpx_client.aclose()
+
     async def send_message(
-        self, message_request: SendMessageRequest
+        self,
+        message_request: SendMessageRequest,
+        deadline: float | None = None,
+        task_callback: Callable[[TaskCallbackArg, AgentCard], None] | None = None,
     ) -> SendMessageResponse:
-        return await self.agent_client.send_message(message_request)
+        """Send a message, giving up at ``deadline`` (Unix time) if one is set.
+
+        With a deadline or a ``task_callback`` the message is streamed: the
+        task id is known from the first event and every task event is passed
+        to ``task_callback`` as it arrives. The seller gets the deadline as a
+        header. If the deadline passes or the caller is cancelled while the
+        task is still running, ``tasks/cancel`` is sent to the seller and the
+        error is re-raised (``TimeoutError`` on expiry).
+        """
+        if deadline is None and task_callback is None:
+            return await self.agent_client.send_message(message_request)
+
+        request = SendStreamingMessageRequest(
+            id=message_request.id, params=message_request.params
+        )
+        http_kwargs = {}
+        if deadline:
+            http_kwargs = {"timeout": remaining(deadline), "headers": deadline_headers(deadline)}
+        task: Task | None = None
+        try:
+            async with asyncio.timeout(remaining(deadline) if deadline else None):
+                async for response in self.agent_client.send_message_streaming(
+                    request, http_kwargs=http_kwargs
+                ):
+                    if not isinstance(response.root, SendStreamingMessageSuccessResponse):
+                        return SendMessageResponse(root=response.root)
+                    result = response.root.result
+                    if isinstance(result, Message):
+                        return SendMessageResponse(
+                            root=SendMessageSuccessResponse(id=request.id, result=result)
+                        )
+                    task = _apply_event(task, result)
+                    if task_callback is not None:
+                        task_callback(result, self.card)
+        except (TimeoutError, asyncio.CancelledError):
+            if task is not None and task.status.state in RUNNING_STATES:
+                self._cancel_in_background(task.id)
+            raise
+        if task is None:
+            return SendMessageResponse(
+                root=JSONRPCErrorResponse(
+                    id=request.id, error=InternalError(message="The seller sent no task")
+                )
+            )
+        return SendMessageResponse(root=SendMessageSuccessResponse(id=request.id, result=task))
+
+    async def cancel_task(self, task_id: str) -> None:
+        request = CancelTaskRequest(id=str(uuid.uuid4()), params=TaskIdParams(id=task_id))
+        try:
+            await self.agent_client.cancel_task(
+                request, http_kwargs={"timeout": CANCEL_TIMEOUT_SECONDS}
+            )
+        except Exception as e:
+            print(f"ERROR: Failed to cancel task {task_id}: {e}")
+
+    def _cancel_in_background(self, task_id: str) -> None:
+        # The caller may itself be cancelled, so the cancel has to outlive it
+        cancel = asyncio.create_task(self.cancel_task(task_id))
+        self._pending_cancels.add(cancel)
+        cancel.add_done_callback(self._pending_cancels.discard)
+
+
+def _apply_event(task: Task | None, event: TaskCallbackArg) -> Task:
+    """Fold a streamed task event into the task as seen so far."""
+    if isinstance(event, Task):
+        return event
+    if task is None:
+        task = Task(
+            id=event.task_id,
+            context_id=event.context_id,
+            status=TaskStatus(state=TaskState.submitted),
+        )
+    if isinstance(event, TaskStatusUpdateEvent):
+        task.status = event.status
+    else:
+        append_artifact_to_task(task, event)
+    return task
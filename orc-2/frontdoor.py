@@ -0,0 +1,284 @@
+"""Per-user fair admission in front of the ADK run endpoints.
+
+``/run`` and ``/run_sse`` requests go through a ``FairQueue``: at most
+``max_concurrency`` runs at once, ``per_user`` per user and ``per_session``
+per session. Waiting requests are served by weighted fair queuing across
+users, so one chatty client cannot starve the others. A request whose
+expected queue wait is over its latency budget (the SLO scaled by its
+``X-Priority``) is shed straight away with a 429 instead of queuing.
+
+``GET /frontdoor/stats`` reports live queue statistics for autoscaling.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import time
+from collections import Counter, deque
+
+RUN_PATHS = ("/run", "/run_sse")
+STATS_PATH = "/frontdoor/stats"
+
+# How much of the SLO a request of each priority may spend queuing
+PRIORITIES = {"high": 2.0, "normal": 1.0, "low": 0.5}
+
+
+class Shed(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("finish", "seq", "user", "session", "priority", "future")
+
+    def __init__(self, finish, seq, user, session, priority, future):
+        self.finish = finish
+        self.seq = seq
+        self.user = user
+        self.session = session
+        self.priority = priority
+        self.future = future
+
+
+class FairQueue:
+    """Weighted fair queuing with per-user and per-session concurrency limits.
+
+    Each queued request gets a virtual finish tag of
+    ``max(virtual time, user's last tag) + 1 / weight``; a freed slot goes to
+    the eligible waiter with the smallest tag. Users default to weight 1.
+    The expected wait is estimated from an EWMA of run durations.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_user: int = 2,
+        per_session: int = 1,
+        slo_seconds: float = 10.0,
+        max_queue: int = 64,
+        weights: dict[str, float] | None = None,
+        clock=time.monotonic,
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_user = per_user
+        self.per_session = per_session
+        self.slo_seconds = slo_seconds
+        self.max_queue = max_queue
+        self.weights = weights or {}
+        self._clock = clock
+        self._seq = itertools.count()
+        self._waiting: list[_Waiter] = []
+        self._in_flight = 0
+        self._by_user: Counter = Counter()
+        self._by_session: Counter = Counter()
+        self._last_finish: dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._service_ewma = 1.0
+        self._waits: deque = deque(maxlen=1000)
+        self._counters: Counter = Counter()
+
+    def estimated_wait(self, user: str | None = None) -> float:
+        wait = 0.0
+        if self._in_flight >= self.max_concurrency:
+            # Every queued request ahead needs a slot to turn over
+            wait = (len(self._waiting) + 1) * self._service_ewma / self.max_concurrency
+        if user is not None and self._by_user[user] >= self.per_user:
+            wait = max(wait, self._service_ewma)
+        return wait
+
+    async def acquire(self, user: str, session: str, priority: str = "normal") -> None:
+        """Wait for a slot, or raise ``Shed`` if the wait would break the SLO."""
+        budget = self.slo_seconds * PRIORITIES.get(priority, 1.0)
+        if len(self._waiting) >= self.max_queue:
+            self._shed("queue_full", priority, self.estimated_wait())
+        weight = self.weights.get(user, 1.0)
+        finish = max(self._virtual_time, self._last_finish.get(user, 0.0)) + 1.0 / weight
+        waiter = _Waiter(
+            finish, next(self._seq), user, session, priority,
+            asyncio.get_running_loop().create_future(),
+        )
+        self._waiting.append(waiter)
+        self._dispatch()
+        if waiter.future.done():
+            self._last_finish[user] = finish
+            self._started(waiter, 0.0)
+            return
+
+        estimate = self.estimated_wait(user)
+        if estimate > budget:
+            self._waiting.remove(waiter)
+            self._shed("slo", priority, estimate)
+        self._last_finish[user] = finish
+        self._counters["queued"] += 1
+        start = self._clock()
+        try:
+            await asyncio.wait_for(waiter.future, budget)
+        except TimeoutError:
+            self._waiting.remove(waiter)
+            self._shed("timeout", priority, self.estimated_wait(user))
+        except BaseException:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Handed a slot just as we were cancelled; give it back
+                self.release(user, session)
+            elif waiter in self._waiting:
+                self._waiting.remove(waiter)
+            raise
+        self._started(waiter, self._clock() - start)
+
+    def release(self, user: str, session: str, service_seconds: float | None = None) -> None:
+        self._in_flight -= 1
+        self._by_user[user] -= 1
+        self._by_session[session] -= 1
+        if not self._by_user[user]:
+            del self._by_user[user]
+        if not self._by_session[session]:
+            del self._by_session[session]
+        if service_seconds is not None:
+            self._service_ewma = 0.8 * self._service_ewma + 0.2 * service_seconds
+        self._dispatch()
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        queued = Counter(w.priority for w in self._waiting)
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "utilization": self._in_flight / self.max_concurrency,
+            "queued": len(self._waiting),
+            "queued_by_priority": dict(queued),
+            "active_users": len(self._by_user),
+            "estimated_wait_seconds": self.estimated_wait(),
+            "service_seconds_ewma": self._service_ewma,
+            "wait_p50_seconds": round(waits[len(waits) // 2], 3) if waits else 0.0,
+            "wait_p95_seconds": round(waits[int(len(waits) * 0.95)], 3) if waits else 0.0,
+            "wait_max_seconds": round(waits[-1], 3) if waits else 0.0,
+            "counters": dict(self._counters),
+        }
+
+    def _eligible(self, waiter: _Waiter) -> bool:
+        return (
+            self._by_user[waiter.user] < self.per_user
+            and self._by_session[waiter.session] < self.per_session
+        )
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_concurrency:
+            eligible = [w for w in self._waiting if self._eligible(w)]
+            if not eligible:
+                return
+            waiter = min(eligible, key=lambda w: (w.finish, w.seq))
+            self._waiting.remove(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.finish)
+            self._in_flight += 1
+            self._by_user[waiter.user] += 1
+            self._by_session[waiter.session] += 1
+            waiter.future.set_result(None)
+
+    def _started(self, waiter: _Waiter, waited: float) -> None:
+        self._waits.append(waited)
+        self._counters["admitted"] += 1
+
+    def _shed(self, reason: str, priority: str, retry_after: float):
+        self._counters[f"shed_{reason}"] += 1
+        self._counters[f"shed_{priority}"] += 1
+        raise Shed(reason, retry_after)
+
+
+def queue_from_env() -> FairQueue:
+    return FairQueue(
+        max_concurrency=int(os.getenv("FRONTDOOR_MAX_CONCURRENCY", "8")),
+        per_user=int(os.getenv("FRONTDOOR_PER_USER", "2")),
+        per_session=int(os.getenv("FRONTDOOR_PER_SESSION", "1")),
+        slo_seconds=float(os.getenv("FRONTDOOR_SLO_SECONDS", "10")),
+        max_queue=int(os.getenv("FRONTDOOR_MAX_QUEUE", "64")),
+        # e.g. {"premium-user": 2, "batch-job": 0.5}
+        weights=json.loads(os.getenv("FRONTDOOR_USER_WEIGHTS", "{}")),
+    )
+
+
+class FrontDoorMiddleware:
+    """ASGI middleware putting a ``FairQueue`` in front of the ADK run endpoints.
+
+    The user and session come from the run request body; the priority from
+    the ``X-Priority`` header (high, normal or low). Shed requests get a
+    429 with ``Retry-After``.
+    """
+
+    def __init__(self, app, queue: FairQueue | None = None):
+        self.app = app
+        self.queue = queue or queue_from_env()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] == "GET" and scope["path"] == STATS_PATH:
+            await _send_json(send, 200, self.queue.stats())
+            return
+        if scope["method"] != "POST" or scope["path"] not in RUN_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            # Let the endpoint reject it
+            await self.app(scope, replay, send)
+            return
+        user = str(payload.get("userId") or payload.get("user_id") or "anonymous")
+        session = f'{user}/{payload.get("sessionId") or payload.get("session_id")}'
+        headers = dict(scope["headers"])
+        priority = headers.get(b"x-priority", b"normal").decode("latin-1").lower()
+
+        try:
+            await self.queue.acquire(user, session, priority)
+        except Shed as e:
+            retry_after = max(1, round(e.retry_after))
+            await _send_json(
+                send,
+                429,
+                {"detail": "Too many requests, retry later", "reason": e.reason, "retryAfter": retry_after},
+                [(b"retry-after", str(retry_after).encode())],
+            )
+            return
+        start = time.monotonic()
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            self.queue.release(user, session, time.monotonic() - start)
+
+
+async def _send_json(send, status: int, data: dict, headers: list | None = None) -> None:
+    body = json.dumps(data).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *(headers or []),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
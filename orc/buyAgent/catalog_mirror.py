@@ -0,0 +1,106 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+
+class CatalogMirror:
+    """A local copy of a seller's inventory kept fresh from its change feed.
+
+    The mirror subscribes to ``GET /inventory/changes`` on the seller as
+    server-sent events, starting from a snapshot and applying each change in
+    sequence order. When the connection drops it reconnects with its last
+    cursor, so the seller replays whatever was missed from its buffer (or
+    sends a fresh snapshot if the mirror fell too far behind).
+
+    Reads never touch the network; ``fresh`` tells whether the copy is
+    currently in sync.
+    """
+
+    def __init__(self, base_url: str, httpx_client: httpx.AsyncClient):
+        self.base_url = base_url.rstrip("/")
+        self._httpx_client = httpx_client
+        self.items: dict[str, dict] = {}
+        self.version = -1
+        self.epoch: str | None = None
+        self.connected = False
+        self.supported = True
+        self.updated_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return self.connected and self.epoch is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    def get(self, name: str) -> dict | None:
+        return self.items.get(name)
+
+    def apply(self, event: str, data: dict) -> None:
+        if event == "snapshot":
+            self.epoch = data["epoch"]
+            self.items = data["items"]
+            self.version = data["version"]
+        elif event == "change" and data["seq"] > self.version:
+            item = {k: v for k, v in data.items() if k not in ("seq", "item")}
+            self.items[data["item"]] = item
+            self.version = data["seq"]
+        self.updated_at = time.time()
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                await self._follow()
+                backoff = 1.0
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    # The seller has no change feed; stay unsupported
+                    self.supported = False
+                    self.connected = False
+                    return
+                print(f"ERROR: Catalog feed from {self.base_url} failed: {e}")
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"ERROR: Catalog feed from {self.base_url} dropped: {e}")
+            self.connected = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _follow(self) -> None:
+        params = {"since": self.version}
+        if self.epoch:
+            params["epoch"] = self.epoch
+        async with self._httpx_client.stream(
+            "GET",
+            f"{self.base_url}/inventory/changes",
+            params=params,
+            headers={"Accept": "text/event-stream"},
+            # The seller sends a heartbeat every 15s
+            timeout=httpx.Timeout(30, read=60),
+        ) as resp:
+            resp.raise_for_status()
+            self.connected = True
+            event, data = "message", []
+            async for line in resp.aiter_lines():
+                if not line:
+                    if data:
+                        self.apply(event, json.loads("\n".join(data)))
+                    event, data = "message", []
+                elif line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].strip())
@@ -0,0 +1,142 @@
+"""Model tiering: send cheap turns to a lighter model, escalate when it struggles.
+
+Every model call is routed along a ladder of models, cheapest first
+(``MODEL_LADDER``). Confirmations, greetings and menu requests stay on the
+bottom tier; long, multi-part or negotiating turns start higher up.
+"""
+
+import os
+import re
+import time
+from collections import Counter, defaultdict, deque
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+# Session state: how many tiers to climb after tool failures or invalid replies
+ESCALATION_KEY = "model_tier_escalation"
+
+# Turns a small model handles fine: confirmations, greetings, "show menu"
+_TRIVIAL = re.compile(
+    r"^\s*(yes|yeah|yep|no|nope|ok|okay|sure|confirm(ed)?|thanks?( you)?|hi|hello|"
+    r"(show|see|list)( me)?( the)? (menu|items|inventory|list))\W*$",
+    re.IGNORECASE,
+)
+# Negotiation and multi-step wording
+_COMPLEX = re.compile(
+    r"\b(compare|cheaper|cheapest|discount|deal|instead|replace|change|split|budget|"
+    r"refund|combine|negotiat\w*)\b",
+    re.IGNORECASE,
+)
+_CLAUSE = re.compile(r",|;|\band\b|\bplus\b|\balso\b|\bthen\b", re.IGNORECASE)
+
+
+def classify(text: str) -> int:
+    """Cheap local difficulty score of a user turn: 0 for trivial turns, higher for harder ones."""
+    if not text.strip() or _TRIVIAL.match(text):
+        return 0
+    score = 0
+    if len(text.split()) > 25:
+        score += 1
+    if len(_CLAUSE.findall(text)) >= 2:
+        score += 1
+    if _COMPLEX.search(text):
+        score += 1
+    return score
+
+
+class ModelRouter:
+    """Picks a model from ``ladder`` (cheapest first) for every model call.
+
+    The turn's tier is its ``classify`` score plus the session's escalation
+    count, capped at the top of the ladder. A failed tool call or an invalid
+    model reply (an error, no content, or a malformed function call) adds
+    one to the escalation; a valid final text reply resets it.
+
+    Use ``before_model``, ``after_model`` and ``after_tool`` as the agent's
+    callbacks. Routing only rewrites ``llm_request.model``, so the agent's
+    own model object makes the call, which can be a fake ``BaseLlm`` in
+    tests. ``stats()`` gives the tier distribution and latency per tier.
+    """
+
+    def __init__(self, ladder: list[str], max_samples: int = 500):
+        if not ladder:
+            raise ValueError("The model ladder needs at least one model")
+        self.ladder = ladder
+        self._calls: Counter = Counter()
+        self._latencies: dict[str, deque] = defaultdict(lambda: deque(maxlen=max_samples))
+        self._started: dict[str, tuple[str, float]] = {}
+        self._counters: Counter = Counter()
+
+    @classmethod
+    def from_env(cls, default: str) -> "ModelRouter":
+        """Ladder from ``MODEL_LADDER`` (comma-separated model names), else ``default``."""
+        ladder = os.getenv("MODEL_LADDER", default)
+        return cls([model.strip() for model in ladder.split(",") if model.strip()])
+
+    def tier_for(self, text: str, escalation: int = 0) -> int:
+        return min(len(self.ladder) - 1, classify(text) + escalation)
+
+    def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        parts = callback_context.user_content.parts if callback_context.user_content else []
+        text = " ".join(part.text for part in parts or [] if part.text)
+        model = self.ladder[self.tier_for(text, callback_context.state.get(ESCALATION_KEY, 0))]
+        llm_request.model = model
+        self._calls[model] += 1
+        self._started[callback_context.invocation_id] = (model, time.perf_counter())
+
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> None:
+        if llm_response.partial:
+            return
+        started = self._started.pop(callback_context.invocation_id, None)
+        if started:
+            self._latencies[started[0]].append(time.perf_counter() - started[1])
+        state = callback_context.state
+        parts = llm_response.content.parts if llm_response.content else None
+        if (
+            llm_response.error_code
+            or not parts
+            or llm_response.finish_reason == types.FinishReason.MALFORMED_FUNCTION_CALL
+        ):
+            self._counters["invalid_replies"] += 1
+            self._escalate(state)
+        elif not any(part.function_call for part in parts) and state.get(ESCALATION_KEY):
+            state[ESCALATION_KEY] = 0
+
+    def after_tool(
+        self, tool: BaseTool, args: dict, tool_context: ToolContext, tool_response
+    ) -> None:
+        if isinstance(tool_response, dict) and set(tool_response) == {"result"}:
+            tool_response = tool_response["result"]
+        if (
+            tool_response is None
+            or (isinstance(tool_response, dict) and "error" in tool_response)
+            or (isinstance(tool_response, str) and tool_response.startswith("ERROR"))
+            # A seller task that came back failed or rejected
+            or getattr(getattr(tool_response, "status", None), "state", None) in ("failed", "rejected")
+        ):
+            self._counters["tool_failures"] += 1
+            self._escalate(tool_context.state)
+
+    def stats(self) -> dict:
+        total = sum(self._calls.values())
+        tiers = {}
+        for model in self.ladder:
+            latencies = sorted(self._latencies[model])
+            tiers[model] = {
+                "calls": self._calls[model],
+                "share": round(self._calls[model] / total, 3) if total else 0.0,
+                "latency_p50_seconds": round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+                "latency_p95_seconds": round(latencies[int(len(latencies) * 0.95)], 3) if latencies else 0.0,
+            }
+        return {"ladder": self.ladder, "tiers": tiers, **self._counters}
+
+    def _escalate(self, state) -> None:
+        level = state.get(ESCALATION_KEY, 0)
+        if level < len(self.ladder) - 1:
+            state[ESCALATION_KEY] = level + 1
+            self._counters["escalations"] += 1
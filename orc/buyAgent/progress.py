@@ -0,0 +1,152 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict
+
+RUN_SSE_PATH = "/run_sse"
+
+
+class ProgressBus:
+    """Fan-out of in-flight progress events, keyed by ADK session id.
+
+    Tools publish while they run; ``ProgressStreamMiddleware`` subscribes for
+    the session of each ``/run_sse`` request. Nothing is buffered for a
+    session nobody is watching, and a slow subscriber drops events rather
+    than holding up the tool.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._dropped = 0
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.maxsize)
+        self._subscribers[session_id].add(queue)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(session_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[session_id]
+
+    def publish(self, session_id: str, event: dict) -> None:
+        for queue in self._subscribers.get(session_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._subscribers),
+            "subscribers": sum(len(q) for q in self._subscribers.values()),
+            "dropped": self._dropped,
+        }
+
+
+bus = ProgressBus()
+
+
+def partial_event(
+    author: str, invocation_id: str, text: str | None = None, metadata: dict | None = None
+) -> dict:
+    """A partial ADK event, as ``/run_sse`` serializes it, for the web UI to render."""
+    event = {
+        "id": str(uuid.uuid4()),
+        "invocationId": invocation_id,
+        "author": author,
+        "partial": True,
+        "timestamp": time.time(),
+    }
+    if text:
+        event["content"] = {"role": "model", "parts": [{"text": text}]}
+    if metadata:
+        event["customMetadata"] = metadata
+    return event
+
+
+class ProgressStreamMiddleware:
+    """ASGI middleware that interleaves ``bus`` events into ``/run_sse`` responses.
+
+    The ADK SSE endpoint only emits events once the agent yields them, so
+    anything a tool streams while it runs (such as a seller's reply) would
+    otherwise wait for the tool to return. Progress events for the request's
+    session are written between the endpoint's own events until its final
+    body message.
+    """
+
+    def __init__(self, app, progress_bus: ProgressBus = bus, path: str = RUN_SSE_PATH):
+        self.app = app
+        self.bus = progress_bus
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        session_id = None
+        if isinstance(payload, dict):
+            session_id = payload.get("sessionId") or payload.get("session_id")
+        if not session_id:
+            await self.app(scope, replay, send)
+            return
+
+        queue = self.bus.subscribe(session_id)
+        lock = asyncio.Lock()
+        streaming = asyncio.Event()
+        finished = False
+
+        async def guarded_send(message):
+            nonlocal finished
+            async with lock:
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    finished = True
+                await send(message)
+            if message["type"] == "http.response.start" and message.get("status") == 200:
+                streaming.set()
+
+        async def pump():
+            await streaming.wait()
+            while True:
+                event = await queue.get()
+                async with lock:
+                    if finished:
+                        return
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": f"data: {json.dumps(event)}\n\n".encode(),
+                            "more_body": True,
+                        }
+                    )
+
+        pump_task = asyncio.create_task(pump())
+        try:
+            await self.app(scope, replay, guarded_send)
+        finally:
+            pump_task.cancel()
+            self.bus.unsubscribe(session_id, queue)
@@ -0,0 +1,125 @@
+import asyncio
+import datetime
+import hashlib
+import logging
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import Client, errors, types
+
+logger = logging.getLogger(__name__)
+
+# Backoff after a failure that may pass (network, 429, 5xx), doubled per failure
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+
+class PromptCache:
+    """Registers the static part of a request with Gemini explicit context caching.
+
+    The system instruction and tool declarations of a request are hashed
+    together with the model name. The first request with a given prefix
+    creates a cached content entry; every later request with the same
+    prefix points ``config.cached_content`` at it and drops the parts that
+    are already cached, so the prefix is billed once per ``ttl_seconds``.
+
+    Entries are recreated ``refresh_margin_seconds`` before they expire. A
+    prefix the API refuses to cache (for example one below the model's
+    minimum size) is remembered and sent uncached from then on. After any
+    other failure the prefix is sent uncached until a backoff has passed,
+    then caching is tried again.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 60,
+        client: Client | None = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._client = client
+        self._entries: dict[str, tuple[str, datetime.datetime]] = {}
+        self._refused: set[str] = set()
+        # Prefix key → (consecutive failures, no new attempt before)
+        self._failures: dict[str, tuple[int, datetime.datetime]] = {}
+        self._lock = asyncio.Lock()
+        self._stats = {"hits": 0, "created": 0, "refused": 0, "failed": 0}
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            self._client = Client()
+        return self._client
+
+    async def apply(self, llm_request: LlmRequest) -> None:
+        config = llm_request.config
+        if not config or not config.system_instruction or config.cached_content:
+            return
+        key = _prefix_key(llm_request)
+        if key in self._refused:
+            return
+        name = await self._cached_content(key, llm_request)
+        if name is None:
+            return
+        self._stats["hits"] += 1
+        config.cached_content = name
+        config.system_instruction = None
+        config.tools = None
+
+    def stats(self) -> dict:
+        return {**self._stats, "entries": len(self._entries)}
+
+    async def _cached_content(self, key: str, llm_request: LlmRequest) -> str | None:
+        async with self._lock:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            entry = self._entries.get(key)
+            margin = datetime.timedelta(seconds=self.refresh_margin_seconds)
+            if entry and entry[1] - margin > now:
+                return entry[0]
+            # While a refresh cannot be made, an entry that has not expired yet still serves
+            current = entry[0] if entry and entry[1] > now else None
+            failures, retry_at = self._failures.get(key, (0, now))
+            if retry_at > now:
+                return current
+            try:
+                cache = await self.client.aio.caches.create(
+                    model=llm_request.model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=llm_request.config.system_instruction,
+                        tools=llm_request.config.tools,
+                        ttl=f"{self.ttl_seconds}s",
+                    ),
+                )
+            except errors.ClientError as e:
+                if e.code != 400:
+                    self._failed(key, failures, now, e)
+                    return current
+                # Invalid for caching, e.g. below the model's minimum size; it will not change
+                logger.warning("Prompt prefix not cacheable, sending it uncached: %s", e)
+                self._stats["refused"] += 1
+                self._refused.add(key)
+                return None
+            except Exception as e:
+                self._failed(key, failures, now, e)
+                return current
+            self._failures.pop(key, None)
+            expires_at = cache.expire_time or now + datetime.timedelta(seconds=self.ttl_seconds)
+            self._entries[key] = (cache.name, expires_at)
+            self._stats["created"] += 1
+            logger.info("Cached prompt prefix %s as %s", key[:12], cache.name)
+            return cache.name
+
+    def _failed(self, key: str, failures: int, now: datetime.datetime, error: Exception) -> None:
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**failures)
+        self._failures[key] = (failures + 1, now + datetime.timedelta(seconds=delay))
+        self._stats["failed"] += 1
+        logger.warning("Prompt prefix not cached, retrying in %ss: %s", delay, error)
+
+
+def _prefix_key(llm_request: LlmRequest) -> str:
+    digest = hashlib.sha256(llm_request.model.encode())
+    # ADK assembles the system instruction as a single string
+    digest.update(str(llm_request.config.system_instruction).encode())
+    for tool in llm_request.config.tools or []:
+        digest.update(tool.model_dump_json(exclude_none=True).encode())
+    return digest.hexdigest()
@@ -0,0 +1,57 @@
+"""App lifespan: warm the purchasing agent up before serving, drain and close it on shutdown.
+
+Startup resolves the seller cards, primes credentials and opens a pooled
+connection to every seller, so the first user request pays none of that.
+On shutdown (SIGTERM on Cloud Run) uvicorn stops accepting connections and
+waits for open requests; then running ``send_task`` calls get
+``SHUTDOWN_GRACE_SECONDS`` to finish before every HTTP client and the
+session store's database connections are closed.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.util import greenlet_spawn
+
+WARM_UP_TIMEOUT_SECONDS = float(os.getenv("WARM_UP_TIMEOUT_SECONDS", "20"))
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("SHUTDOWN_GRACE_SECONDS", "8"))
+
+# The ADK session service builds its own engine; remember every engine that connects
+_engines: set[Engine] = set()
+
+
+@event.listens_for(Engine, "engine_connect")
+def _track_engine(connection, *args):
+    _engines.add(connection.engine)
+
+
+async def close_engines() -> None:
+    for engine in list(_engines):
+        # Also works for the sync side of an async engine
+        await greenlet_spawn(engine.dispose)
+    _engines.clear()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    from buyAgent.agent import purchasing_agent
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(purchasing_agent.warm_up(), WARM_UP_TIMEOUT_SECONDS)
+    except Exception as e:
+        # Serve anyway; the first request retries discovery
+        print(f"ERROR: Warm-up did not finish: {e!r}")
+    print(f"Warm-up took {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    yield
+
+    running = await purchasing_agent.drain(SHUTDOWN_GRACE_SECONDS)
+    if running:
+        print(f"ERROR: {running} send_task calls still running after {SHUTDOWN_GRACE_SECONDS:.0f}s")
+    await purchasing_agent.aclose()
+    await close_engines()
@@ -2,6 +2,11 @@ import os
 import uvicorn
 from google.adk.cli.fast_api import get_fast_api_app
 
+from buyAgent.deadline import DeadlineMiddleware
+from buyAgent.progress import ProgressStreamMiddleware
+from frontdoor import FrontDoorMiddleware
+from lifespan import SHUTDOWN_GRACE_SECONDS, lifespan
+
 # Get the directory where this script is located
 AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -29,8 +34,27 @@ app = get_fast_api_app(
     session_service_uri=SESSION_SERVICE_URI,
     allow_origins=ALLOWED_ORIGINS,
     web=SERVE_WEB_INTERFACE,
+    lifespan=lifespan,
 )
 
+# Middleware added last runs first: deadline, then admission, then progress
+# Seller replies stream into /run_sse while send_task is still running
+app.add_middleware(ProgressStreamMiddleware)
+# Fair per-user admission for the run endpoints, with stats at /frontdoor/stats
+app.add_middleware(FrontDoorMiddleware)
+# Each request gets a deadline (X-Request-Deadline / X-Request-Timeout or
+# REQUEST_BUDGET_SECONDS) that seller calls inherit, queueing time included
+app.add_middleware(DeadlineMiddleware)
+
+
+@app.get("/models/stats")
+async def model_stats():
+    """Share of model calls and latency per tier of the purchasing agent's model ladder."""
+    from buyAgent.agent import purchasing_agent
+
+    return purchasing_agent.model_router.stats()
+
+
 # You can add custom FastAPI routes here if needed
 # Example:
 # @app.get("/hello")
@@ -39,4 +63,9 @@ app = get_fast_api_app(
 
 if __name__ == "__main__":
     # Use the PORT env var set by Cloud Run, default to 8080 locally
-    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 8080)),
+        timeout_graceful_shutdown=int(SHUTDOWN_GRACE_SECONDS),
+    )
@@ -0,0 +1,134 @@
+"""Check of ``ModelRouter`` escalation against a scripted fake model, with no Gemini calls.
+
+Runs an agent whose model is a ``BaseLlm`` fake that answers from a script
+and records the model each request was routed to, and asserts that:
+
+- an invalid reply (an error) escalates the next call one tier,
+- a valid text reply resets the escalation,
+- a failed tool call escalates the follow-up call within the same turn.
+
+Exits non-zero on any deviation. Every copy of ``model_tier.py`` can
+be checked with ``--module``:
+
+    python model_tier_check.py
+    python model_tier_check.py --module ../fruits/fruit_seller_agent/model_tier.py
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import sys
+from typing import AsyncGenerator
+
+from google.adk.agents import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LADDER = ["tier-0", "tier-1", "tier-2"]
+
+
+class ScriptedLlm(BaseLlm):
+    """Answers every request with the next scripted reply and records the model it was routed to."""
+
+    model: str = LADDER[0]
+    replies: list[LlmResponse] = []
+    routed: list[str] = []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.routed.append(llm_request.model)
+        yield self.replies.pop(0)
+
+
+def text(reply: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=reply)]))
+
+
+def call(name: str) -> LlmResponse:
+    part = types.Part(function_call=types.FunctionCall(name=name, args={}))
+    return LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def check_stock() -> str:
+    """Check the stock of the requested item."""
+    return "ERROR: the inventory service is unavailable"
+
+
+def load_model_tier(path: str):
+    # By path, so the agent package (and its remote agents) is not imported
+    spec = importlib.util.spec_from_file_location("model_tier", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def run_check(model_tier) -> list[str]:
+    router = model_tier.ModelRouter(LADDER)
+    llm = ScriptedLlm(
+        replies=[
+            # Turn 1: an error reply escalates
+            LlmResponse(error_code="UNAVAILABLE", error_message="injected"),
+            # Turn 2: one tier up; a valid reply resets
+            text("We have apples."),
+            # Turn 3: back on the bottom tier; a failed tool escalates the follow-up call
+            call("check_stock"),
+            text("Sorry, I cannot check the stock right now."),
+        ]
+    )
+    agent = Agent(
+        name="model_tier_check",
+        model=llm,
+        instruction="Answer briefly.",
+        tools=[check_stock],
+        before_model_callback=router.before_model,
+        after_model_callback=router.after_model,
+        after_tool_callback=router.after_tool,
+    )
+    runner = InMemoryRunner(agent=agent, app_name="model_tier_check")
+    session = await runner.session_service.create_session(app_name="model_tier_check", user_id="check")
+    failures = []
+    for turn, expected_escalation in enumerate((1, 0, 0), start=1):
+        message = types.Content(role="user", parts=[types.Part(text="yes")])
+        async for _ in runner.run_async(user_id="check", session_id=session.id, new_message=message):
+            pass
+        state = (
+            await runner.session_service.get_session(
+                app_name="model_tier_check", user_id="check", session_id=session.id
+            )
+        ).state
+        if state.get(model_tier.ESCALATION_KEY, 0) != expected_escalation:
+            failures.append(
+                f"escalation after turn {turn}: "
+                f"{state.get(model_tier.ESCALATION_KEY, 0)}, expected {expected_escalation}"
+            )
+    expected = ["tier-0", "tier-1", "tier-0", "tier-1"]
+    if llm.routed != expected:
+        failures.append(f"models {llm.routed}, expected {expected}")
+    print(f"routed: {llm.routed}")
+    print(f"stats: {router.stats()}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--module", default=os.path.join(HERE, "buyAgent", "model_tier.py"), help="model_tier.py to check"
+    )
+    args = parser.parse_args()
+
+    failures = asyncio.run(run_check(load_model_tier(args.module)))
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: escalates on an invalid reply and a failed tool, resets on a valid reply")
+
+
+if __name__ == "__main__":
+    main()
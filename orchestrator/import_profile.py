@@ -0,0 +1,82 @@
+"""Import-time profile of the agent package, checked against a budget.
+
+Runs ``python -X importtime`` on the agent module in a fresh interpreter and
+prints the slowest modules (module -> ms). Exits non-zero when the total
+import time exceeds the budget, so it can gate CI or a container build.
+
+    python import_profile.py --budget-ms 300
+    python import_profile.py --build   # also time get_root_agent()
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def profile_imports(module: str) -> list[tuple[str, float, float, int]]:
+    """Return (module, self_ms, cumulative_ms, depth) for every import, in import order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        sys.exit(f"Importing {module} failed:\n{result.stderr}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    # Drop the interpreter's own startup imports, which end with `site`
+    starts = [i for i, row in enumerate(rows) if row[0] == "site" and row[3] == 0]
+    return rows[starts[-1] + 1:] if starts else rows
+
+
+def time_build(module: str) -> float:
+    """Milliseconds spent in ``get_root_agent()`` after the module is imported."""
+    code = (
+        "import time, importlib\n"
+        f"m = importlib.import_module({module!r})\n"
+        "t = time.perf_counter()\n"
+        "m.get_root_agent()\n"
+        "print((time.perf_counter() - t) * 1000)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(f"Building the root agent failed:\n{result.stderr}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="orchestrator_agent.agent")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument(
+        "--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "500"))
+    )
+    parser.add_argument("--build", action="store_true", help="also time get_root_agent()")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    # Top-level entries are the imports made directly by `import <module>`
+    total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+
+    print(f"{'module':<60} {'self ms':>10} {'cumul ms':>10}")
+    for name, self_ms, cumulative, _ in sorted(rows, key=lambda r: r[2], reverse=True)[: args.top]:
+        print(f"{name:<60} {self_ms:>10.1f} {cumulative:>10.1f}")
+    print(f"\nTotal import time: {total:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if args.build:
+        print(f"get_root_agent(): {time_build(args.module):.1f} ms")
+
+    if total > args.budget_ms:
+        sys.exit(f"Import time {total:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,85 +1,201 @@
-from google.adk.agents import Agent
-from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
-from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+"""Orchestrator agent that delegates to remote sellers from ``sellers.json``.
+
+Importing this module does no subprocess, network or client work. The
+ADK agent tree, its HTTP client and credentials are built by
+``get_root_agent()`` the first time ``root_agent`` is read (which is how the
+ADK loader picks the agent up) or earlier during startup warm-up. The
+identity token itself is only fetched on the first outgoing request.
+"""
+
+import asyncio
 import os
 import subprocess
+import threading
+import time
+
 import httpx
 
 # Load environment variables (Optional, if you are using environment variables)
 from dotenv import load_dotenv
 load_dotenv()
 
-# Function to get the authentication token
-def get_auth_token():
-    try:
-        # Get the identity token using gcloud
-        token = subprocess.check_output(['gcloud', 'auth', 'print-identity-token'], text=True).strip()
-        return token
-    except subprocess.CalledProcessError:
-        # Fallback to environment variable if gcloud command fails
-        return os.getenv('AUTH_TOKEN', '')
-
-# Get the authentication token
-auth_token = get_auth_token()
-
-# Create HTTP client with authentication headers
-headers = {
-    'Authorization': f'Bearer {auth_token}',
-    'Content-Type': 'application/json'
-}
-
-# Create custom HTTP client with authentication
-httpx_client = httpx.AsyncClient(headers=headers)
-
-pizza_agent = RemoteA2aAgent(
-    name="pizza_agent",
-    description="Agent that handles fruit sales.",
-    agent_card=f"https://au-pizza-agent-328611943961.us-central1.run.app/.well-known/agent.json",
-    httpx_client=httpx_client,
-)
-
-burger_agent = RemoteA2aAgent(
-    name="burger_agent",
-    description="Agent that handles vegetable sales.",
-    agent_card=f"https://au-burger-agent-328611943961.us-central1.run.app/.well-known/agent.json",
-    httpx_client=httpx_client,
+SELLERS_CONFIG = os.getenv(
+    "SELLERS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sellers.json")
 )
+SELLER_TOP_K = int(os.getenv("SELLER_TOP_K", "3"))
 
-# Orchestrator Agent that delegates tasks
-root_agent = Agent(
-    model="gemini-2.0-flash",
-    name="orchestrator_agent",
-    description="Orchestrates between Fruit and Vegetable Seller Agents.",
-    instruction="""
+INSTRUCTION = """
     # INSTRUCTIONS
 
         You are an Orchestrator Agent.
-        Your sole purpose is to help users buy items from two remote specialized agents:
-        - Burger Agent (handles burger menu & order creation)
-        - Pizza Agent (handles pizza menu & order creation)
+        Your sole purpose is to help users buy items from remote specialized seller agents.
+        The sellers relevant to the current request are listed under SELLERS FOR THIS TURN.
 
         You must not create or assume menus, prices, or order details yourself. 
-        Always rely on Burger Agent and Pizza Agent responses via A2A protocol. 
+        Always rely on the seller agents' responses via A2A protocol. 
         Your role is to interpret user intent, route requests, and deliver the final structured response back to the user.
 
         # CONTEXT
 
-        - If the user asks about burgers → communicate with Burger Agent only.
-        - If the user asks about pizzas → communicate with Pizza Agent only.
-        - If unclear whether the user wants pizza or burger → ask for clarification.
+        - To communicate with a seller, hand the conversation over with `transfer_to_seller`.
+        - If the user asks about items from one seller → communicate with that seller only.
+        - If unclear which seller the user wants → ask for clarification.
         - Do not attempt to answer unrelated questions or use tools for other purposes.
 
         # RULES
 
-        1. Always determine the user's intent (burger or pizza).
+        1. Always determine the user's intent (which seller and which items).
         2. If the user has not confirmed the order and total price → ask for confirmation before proceeding.
         3. If confirmed → forward the structured order request to the respective remote agent using A2A protocol.
-        4. Wait for response from Burger/Pizza Agent and then:
+        4. Wait for response from the seller agent and then:
         - If status = input_required → ask the user for the missing details.
         - If status = error → inform the user that there was an error.
         - If status = completed → present the detailed ordered items, price breakdown, total, and order ID to the user.
         5. Always deliver user-friendly responses while preserving accuracy from the remote agent.
-    """,
-    global_instruction="You are a sales orchestrator that communicates with fruit and vegetable agents.",
-    sub_agents=[pizza_agent, burger_agent],  # Includes both remote agents
-)
+
+        # SELLERS FOR THIS TURN
+
+"""
+
+# Identity tokens are valid for an hour; refresh a little earlier
+TOKEN_TTL_SECONDS = 50 * 60
+
+# Function to get the authentication token
+def get_auth_token():
+    try:
+        # Get the identity token using gcloud
+        token = subprocess.check_output(['gcloud', 'auth', 'print-identity-token'], text=True).strip()
+        return token
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        # Fallback to environment variable if gcloud command fails
+        return os.getenv('AUTH_TOKEN', '')
+
+
+class IdentityTokenAuth(httpx.Auth):
+    """Bearer auth that fetches the identity token on first use and refreshes it on expiry."""
+
+    def __init__(self, fetch_token=get_auth_token, ttl_seconds: float = TOKEN_TTL_SECONDS):
+        self._fetch_token = fetch_token
+        self._ttl_seconds = ttl_seconds
+        self._token = ""
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def token(self) -> str:
+        async with self._lock:
+            if time.monotonic() >= self._expires_at:
+                # gcloud is a subprocess; keep it off the event loop
+                self._token = await asyncio.to_thread(self._fetch_token)
+                self._expires_at = time.monotonic() + self._ttl_seconds
+            return self._token
+
+    async def async_auth_flow(self, request):
+        request.headers['Authorization'] = f'Bearer {await self.token()}'
+        yield request
+
+
+def build_root_agent():
+    """Build the orchestrator; remote sellers come from the registry on demand."""
+    from a2a.client import ClientConfig, ClientFactory
+    from a2a.types import TransportProtocol
+    from google.adk.agents import Agent
+    from google.adk.agents.readonly_context import ReadonlyContext
+    from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
+    from google.adk.tools.tool_context import ToolContext
+
+    from .deadline import propagate_deadline
+    from .directory import SellerDirectory
+    from .registry import SellerRegistry
+
+    # Create custom HTTP client with authentication
+    httpx_client = httpx.AsyncClient(
+        auth=IdentityTokenAuth(),
+        headers={'Content-Type': 'application/json'},
+        # Every seller call carries the request deadline and times out with it
+        event_hooks={'request': [propagate_deadline]},
+    )
+
+    # Stream seller replies (message/stream) so they reach /run_sse as they are written
+    client_factory = ClientFactory(
+        ClientConfig(
+            httpx_client=httpx_client,
+            streaming=True,
+            supported_transports=[TransportProtocol.jsonrpc],
+        )
+    )
+
+    def build_seller(entry: dict) -> RemoteA2aAgent:
+        return RemoteA2aAgent(
+            name=entry["name"],
+            description=entry["description"],
+            agent_card=entry["agent_card"],
+            httpx_client=httpx_client,
+            a2a_client_factory=client_factory,
+        )
+
+    registry = SellerRegistry(SELLERS_CONFIG, build_seller)
+
+    def instruction(context: ReadonlyContext) -> str:
+        # Only the sellers relevant to this turn (and the one already in use) go into the prompt
+        parts = context.user_content.parts if context.user_content else []
+        text = " ".join(part.text for part in parts if part.text)
+        sellers = registry.select(
+            text, SELLER_TOP_K, include=(context.state.get("active_seller"),)
+        )
+        listing = "\n".join(
+            f"        - {seller['name']}: {seller['description']}" for seller in sellers
+        )
+        return INSTRUCTION + (listing or "        - No seller matches this request.") + "\n"
+
+    def transfer_to_seller(seller_name: str, tool_context: ToolContext) -> str:
+        """Hands the conversation over to a remote seller agent.
+
+        Args:
+            seller_name: The name of a seller from the sellers listed for this turn.
+            tool_context: The tool context this method runs in.
+        """
+        if registry.get(seller_name) is None:
+            return f"Unknown seller {seller_name}. Use one of the listed sellers."
+        root.ensure_seller(seller_name)
+        tool_context.state["active_seller"] = seller_name
+        tool_context.actions.transfer_to_agent = seller_name
+        return f"Transferring to {seller_name}."
+
+    # Orchestrator Agent that delegates tasks
+    orchestrator = Agent(
+        model="gemini-2.0-flash",
+        name="sales_orchestrator",
+        description="Routes purchase requests to the relevant remote seller agents.",
+        instruction=instruction,
+        global_instruction="You are a sales orchestrator that communicates with remote seller agents.",
+        tools=[transfer_to_seller],
+    )
+
+    root = SellerDirectory(
+        name="orchestrator_agent",
+        description="Orchestrates between remote seller agents.",
+        registry=registry,
+        orchestrator_name=orchestrator.name,
+        sub_agents=[orchestrator],
+    )
+    return root
+
+
+_root_agent = None
+_root_agent_lock = threading.Lock()
+
+
+def get_root_agent():
+    """Return the orchestrator, building it on first use."""
+    global _root_agent
+    with _root_agent_lock:
+        if _root_agent is None:
+            _root_agent = build_root_agent()
+    return _root_agent
+
+
+def __getattr__(name):
+    # PEP 562: the ADK loader reads `agent.root_agent`, which lands here
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
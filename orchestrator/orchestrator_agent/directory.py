@@ -0,0 +1,39 @@
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+from .deadline import ensure_deadline
+from .registry import SellerRegistry
+
+
+class SellerDirectory(BaseAgent):
+    """Root agent that owns the orchestrator and the remote sellers built so far.
+
+    Every turn starts at the orchestrator. Sellers are attached as
+    sub-agents on demand, which lets the orchestrator transfer to them by
+    name, while the orchestrator itself has no sub-agents and so never gets
+    the whole seller list injected into its prompt.
+    """
+
+    registry: SellerRegistry
+    orchestrator_name: str
+
+    def ensure_seller(self, name: str) -> BaseAgent:
+        """Build seller ``name`` if needed and attach it to the agent tree."""
+        agent = self.registry.agent(name)
+        if agent.parent_agent is not self:
+            # Replaces a stale agent of the same name after a config reload
+            self.sub_agents = [a for a in self.sub_agents if a.name != name] + [agent]
+            agent.parent_agent = self
+        return agent
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        # Calls to the sellers carry what is left of this budget
+        ensure_deadline(ctx.invocation_id)
+        orchestrator = self.find_sub_agent(self.orchestrator_name)
+        async for event in orchestrator.run_async(ctx):
+            yield event
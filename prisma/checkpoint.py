@@ -0,0 +1,97 @@
+"""Durable progress checkpoints, so an interrupted run can continue with ``--resume``.
+
+Every finished (project, service, location) unit is appended to a JSON
+Lines file and synced to disk. The first line names the job; resuming
+from a checkpoint of another job is refused.
+"""
+
+import json
+import os
+import threading
+
+from engine import Unit
+
+
+class Checkpoint:
+    def __init__(self, path: str, job: str, resume: bool = False):
+        self.path = path
+        self.completed: set[Unit] = set()
+        if resume and os.path.exists(path):
+            with open(path, "rb+") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("job") != job:
+                    raise ValueError(f"{path} is a checkpoint of {header.get('job')!r}, not {job!r}")
+                end = f.tell()
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        self.completed.add(Unit(*json.loads(line)))
+                    except ValueError:
+                        break
+                    end += len(line)
+                # Drop a line cut short by a crash; that unit is not done
+                f.truncate(end)
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            self._write({"job": job})
+        self._lock = threading.Lock()
+
+    def remaining(self, units: list[Unit]) -> list[Unit]:
+        return [unit for unit in units if unit not in self.completed]
+
+    def done(self, unit: Unit) -> None:
+        with self._lock:
+            self.completed.add(unit)
+            self._write(list(unit))
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _write(self, record) -> None:
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+class PendingUnits:
+    """Checkpoints a remediation unit once it is listed and every change queued for it went through.
+
+    Takes the place of the ``Checkpoint`` in ``scan.run_check``: ``done``
+    marks the listing complete, while the unit's writes may still be running.
+    """
+
+    def __init__(self, checkpoint: Checkpoint):
+        self.checkpoint = checkpoint
+        self._pending: dict[Unit, int] = {}
+        self._listed: set[Unit] = set()
+        self._failed: set[Unit] = set()
+        self._lock = threading.Lock()
+
+    def queued(self, unit: Unit) -> None:
+        with self._lock:
+            self._pending[unit] = self._pending.get(unit, 0) + 1
+
+    def finished(self, unit: Unit, ok: bool) -> None:
+        with self._lock:
+            self._pending[unit] -= 1
+            if not ok:
+                self._failed.add(unit)
+            complete = self._complete(unit)
+        if complete:
+            self.checkpoint.done(unit)
+
+    def done(self, unit: Unit) -> None:
+        with self._lock:
+            self._listed.add(unit)
+            complete = self._complete(unit)
+        if complete:
+            self.checkpoint.done(unit)
+
+    def _complete(self, unit: Unit) -> bool:
+        if unit not in self._listed or self._pending.get(unit) or unit in self._failed:
+            return False
+        self._listed.discard(unit)
+        self._pending.pop(unit, None)
+        return True
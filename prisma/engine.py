@@ -0,0 +1,91 @@
+"""Concurrent scan engine: fans a label scan out over (project, service, location) units.
+
+Units run on a bounded thread pool, since the Google Cloud clients block.
+Every API request first takes a token from its service's rate limiter, so
+a wide pool cannot blow through a per-API quota. Results come back in the
+order the units were given, whatever order they finish in.
+"""
+
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+MAX_WORKERS = int(os.getenv("SCAN_MAX_WORKERS", "16"))
+# Resources evaluated together
+BATCH_SIZE = 500
+
+
+class Unit(NamedTuple):
+    project_id: str
+    service: str
+    # None for global services (GCS, BigQuery, Pub/Sub)
+    location: str | None = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests per second, in bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def limiters_from_env(defaults: dict[str, float]) -> dict[str, TokenBucket]:
+    """One limiter per service; ``SCAN_RATE_<SERVICE>`` overrides the default requests per second."""
+    return {
+        service: TokenBucket(float(os.getenv(f"SCAN_RATE_{service.upper()}", rate)))
+        for service, rate in defaults.items()
+    }
+
+
+def paged(list_call, limiter: TokenBucket, field: str | None = None):
+    """Yield the items of a Google API list call, taking a token before each page request.
+
+    Args:
+        list_call: Zero-argument callable returning the API's list iterator or pager.
+        limiter: The rate limiter of the API.
+        field: For GAPIC pagers, the response field holding the items
+            (e.g. ``"repositories"``); None for ``google.api_core`` page iterators.
+    """
+    limiter.acquire()
+    pages = iter(list_call().pages)
+    page = next(pages, None)
+    while page is not None:
+        yield from (getattr(page, field) if field else page)
+        limiter.acquire()
+        page = next(pages, None)
+
+
+def batched(iterable, size: int):
+    """Yield lists of up to ``size`` items."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def run_units(units: list, check, max_workers: int = MAX_WORKERS) -> list:
+    """Run ``check(unit)`` for every unit (or other work item) on a bounded pool.
+
+    Returns:
+        The results in the order of ``units``.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan") as pool:
+        return list(pool.map(check, units))
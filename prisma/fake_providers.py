@@ -0,0 +1,124 @@
+"""In-memory providers that synthesize resources, for tests and benchmarks.
+
+Resources are generated on the fly from a seed, so a fake can serve 100k+
+resources per project without holding them; only written labels are kept.
+Latency is simulated per page and per write. ``error_rate`` makes that
+share of page and write calls fail with a (retryable) ``QuotaError``, and
+``conflict_rate`` that share of writes fail with ``ConflictError``.
+Given ``locations``, a fake discovers them, and has no resources in
+``empty_locations``. Non-compliant resources carry each ``forbidden``
+label half the time. With ``merge_writes`` (the BigQuery fake), writes
+merge into the labels like BigQuery's PATCH and are read back, as the
+real provider does.
+"""
+
+import random
+import threading
+import time
+
+from provider import SERVICES, ConflictError, Provider, QuotaError, Resource, check_written, label_patch
+
+
+class FakeProvider(Provider):
+    def __init__(
+        self,
+        service: str,
+        required: dict[str, str],
+        count: int = 1000,
+        compliant_ratio: float = 0.5,
+        page_size: int = 500,
+        page_latency: float = 0.0,
+        write_latency: float = 0.0,
+        error_rate: float = 0.0,
+        conflict_rate: float = 0.0,
+        locations: list[str] | None = None,
+        empty_locations=(),
+        forbidden=(),
+        merge_writes: bool = False,
+        seed: int = 0,
+    ):
+        self.service = service
+        self.required = required
+        self.count = count
+        self.compliant_ratio = compliant_ratio
+        self.page_size = page_size
+        self.page_latency = page_latency
+        self.write_latency = write_latency
+        self.error_rate = error_rate
+        self.conflict_rate = conflict_rate
+        self.locations = locations
+        self.empty_locations = set(empty_locations)
+        self.forbidden = list(forbidden)
+        self.merge_writes = merge_writes
+        self.seed = seed
+        self.written: dict[tuple[str, str | None, str], dict[str, str]] = {}
+        self.calls = {"pages": 0, "writes": 0, "locations": 0, "errors": 0, "conflicts": 0}
+        self._lock = threading.Lock()
+
+    def labels_of(self, project_id: str, location: str | None, index: int) -> dict[str, str]:
+        name = self._name(index)
+        if (project_id, location, name) in self.written:
+            return dict(self.written[(project_id, location, name)])
+        rng = random.Random(f"{self.seed}/{project_id}/{location}/{index}")
+        labels = {"env": rng.choice(["dev", "prod"])}
+        if rng.random() < self.compliant_ratio:
+            labels.update(self.required)
+        else:
+            labels.update({k: v for k, v in self.required.items() if rng.random() < 0.5})
+            labels.update({k: "true" for k in self.forbidden if rng.random() < 0.5})
+        return labels
+
+    def _list(self, project_id, location):
+        if location in self.empty_locations:
+            self._call("pages", self.page_latency)
+            return
+        for start in range(0, self.count, self.page_size):
+            self._call("pages", self.page_latency)
+            for index in range(start, min(start + self.page_size, self.count)):
+                name = self._name(index)
+                yield Resource(name, self.labels_of(project_id, location, index), (location, name))
+
+    def _write(self, project_id, resource, labels):
+        self._call("writes", self.write_latency)
+        if self.conflict_rate and random.random() < self.conflict_rate:
+            with self._lock:
+                self.calls["conflicts"] += 1
+            raise ConflictError("Injected conflict")
+        location, name = resource.handle
+        key = (project_id, location, name)
+        with self._lock:
+            if not self.merge_writes:
+                self.written[key] = dict(labels)
+                return
+            merged = {**resource.labels, **label_patch(resource.labels, labels)}
+            self.written[key] = {k: v for k, v in merged.items() if v is not None}
+            written = dict(self.written[key])
+        check_written(resource, written, labels)
+
+    def _list_locations(self, project_id):
+        if not self.info.regional or self.locations is None:
+            return None
+        self._call("locations", self.page_latency)
+        return list(self.locations)
+
+    def _name(self, index: int) -> str:
+        return f"{SERVICES[self.service].kind}-{index:07d}"
+
+    def _call(self, counter: str, latency: float) -> None:
+        if latency:
+            time.sleep(latency)
+        with self._lock:
+            self.calls[counter] += 1
+            failed = self.error_rate and random.random() < self.error_rate
+            if failed:
+                self.calls["errors"] += 1
+        if failed:
+            raise QuotaError(f"Injected {counter[:-1]} error")
+
+
+def fake_providers(required: dict[str, str], **options) -> dict[str, FakeProvider]:
+    """One fake per service, in report order; ``options`` go to every ``FakeProvider``."""
+    return {
+        service: FakeProvider(service, required, merge_writes=service == "bigquery", **options)
+        for service in SERVICES
+    }
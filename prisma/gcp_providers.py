@@ -0,0 +1,160 @@
+"""Google Cloud implementations of the resource providers."""
+
+import functools
+
+from google.cloud import storage, bigquery, pubsub_v1, metastore_v1
+from google.cloud import artifactregistry_v1
+from google.api_core.exceptions import (
+    GoogleAPICallError,
+    PreconditionFailed,
+    ServiceUnavailable,
+    TooManyRequests,
+)
+from google.protobuf import field_mask_pb2
+
+from engine import TokenBucket, paged
+from provider import Provider, Resource, check_written, label_patch
+
+
+class GcpProvider(Provider):
+    errors = (GoogleAPICallError,)
+    # ResourceExhausted (gRPC quota) is a TooManyRequests
+    quota_errors = (TooManyRequests, ServiceUnavailable)
+    conflict_errors = (PreconditionFailed,)
+
+    def __init__(self, limiter: TokenBucket):
+        self.limiter = limiter
+
+    def _write(self, project_id, resource, labels):
+        self.limiter.acquire()
+        self._update(project_id, resource, labels)
+
+    def _update(self, project_id, resource, labels):
+        raise NotImplementedError
+
+    def _list_locations(self, project_id):
+        if not self.info.regional:
+            return None
+        # The google.cloud.location mixin of the regional GAPIC clients
+        locations = []
+        request = {"name": f"projects/{project_id}"}
+        while True:
+            self.limiter.acquire()
+            response = self.client.list_locations(request=request)
+            locations += [location.location_id for location in response.locations]
+            if not response.next_page_token:
+                return locations
+            request["page_token"] = response.next_page_token
+
+
+class StorageProvider(GcpProvider):
+    service = 'storage'
+
+    # Clients are thread-safe; build each one once per project
+    @functools.lru_cache(maxsize=None)
+    def client(self, project_id):
+        return storage.Client(project=project_id)
+
+    def _list(self, project_id, location):
+        client = self.client(project_id)
+        for bucket in paged(lambda: client.list_buckets(project=project_id), self.limiter):
+            yield Resource(bucket.name, dict(bucket.labels or {}), bucket, bucket.etag)
+
+    def _update(self, project_id, resource, labels):
+        bucket = resource.handle
+        bucket.labels = labels
+        # Only if nobody changed the bucket's metadata since it was listed
+        bucket.patch(if_metageneration_match=bucket.metageneration)
+
+
+class BigQueryProvider(GcpProvider):
+    service = 'bigquery'
+
+    @functools.lru_cache(maxsize=None)
+    def client(self, project_id):
+        return bigquery.Client(project=project_id)
+
+    def _list(self, project_id, location):
+        # List results already carry each dataset's labels; no get_dataset per dataset
+        for dataset in paged(self.client(project_id).list_datasets, self.limiter):
+            yield Resource(dataset.dataset_id, dict(dataset.labels or {}), dataset)
+
+    def _update(self, project_id, resource, labels):
+        dataset = bigquery.Dataset(resource.handle.reference)
+        # PATCH merges labels: a label is only removed when sent as None
+        dataset.labels = label_patch(resource.labels, labels)
+        updated = self.client(project_id).update_dataset(dataset, ["labels"])
+        check_written(resource, dict(updated.labels or {}), labels)
+
+
+class ArtifactRegistryProvider(GcpProvider):
+    service = 'artifactregistry'
+
+    @functools.cached_property
+    def client(self):
+        return artifactregistry_v1.ArtifactRegistryClient()
+
+    def _list(self, project_id, location):
+        parent = f"projects/{project_id}/locations/{location}"
+        repos = paged(lambda: self.client.list_repositories(parent=parent), self.limiter, 'repositories')
+        for repo in repos:
+            yield Resource(repo.name.split("/")[-1], dict(repo.labels), repo, str(repo.update_time))
+
+    def _update(self, project_id, resource, labels):
+        repo = resource.handle
+        repo.labels = labels
+        self.client.update_repository(repository=repo, update_mask={"paths": ["labels"]})
+
+
+class MetastoreProvider(GcpProvider):
+    service = 'metastore'
+
+    @functools.cached_property
+    def client(self):
+        return metastore_v1.DataprocMetastoreClient()
+
+    def _list(self, project_id, location):
+        parent = f"projects/{project_id}/locations/{location}"
+        services = paged(lambda: self.client.list_services(parent=parent), self.limiter, 'services')
+        for service in services:
+            yield Resource(
+                service.name.split("/")[-1], dict(service.labels), service, str(service.update_time)
+            )
+
+    def _update(self, project_id, resource, labels):
+        service = resource.handle
+        service.labels = labels
+        update_mask = field_mask_pb2.FieldMask(paths=["labels"])
+        self.client.update_service(service=service, update_mask=update_mask)
+
+
+class PubSubProvider(GcpProvider):
+    service = 'pubsub'
+
+    @functools.cached_property
+    def client(self):
+        return pubsub_v1.SubscriberClient()
+
+    def _list(self, project_id, location):
+        subs = paged(
+            lambda: self.client.list_subscriptions(request={"project": f"projects/{project_id}"}),
+            self.limiter,
+            'subscriptions',
+        )
+        for sub in subs:
+            yield Resource(sub.name.split("/")[-1], dict(sub.labels), sub)
+
+    def _update(self, project_id, resource, labels):
+        update_mask = field_mask_pb2.FieldMask(paths=["labels"])
+        self.client.update_subscription(
+            subscription={"name": resource.handle.name, "labels": labels},
+            update_mask=update_mask,
+        )
+
+
+PROVIDERS = (StorageProvider, BigQueryProvider, ArtifactRegistryProvider, MetastoreProvider, PubSubProvider)
+
+
+def gcp_providers(limiters: dict[str, TokenBucket]) -> dict[str, Provider]:
+    """One provider per service, in report order, each throttled by its service's limiter."""
+    return {cls.service: cls(limiters[cls.service]) for cls in PROVIDERS}
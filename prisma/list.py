@@ -1,119 +1,33 @@
+import argparse
+import functools
 import logging
-from google.cloud import storage, bigquery, pubsub_v1, metastore_v1
-from google.cloud import artifactregistry_v1
-from google.api_core.exceptions import GoogleAPICallError
+import time
+
+from engine import MAX_WORKERS, limiters_from_env, run_units
+from gcp_providers import gcp_providers
+from locations import LocationCache, discover_locations
+from checkpoint import Checkpoint, PendingUnits
+from policy import DEFAULT_PATH, Policy
+from projects import add_arguments, project_ids_from
+from remediate import RETRIES, Remediator
+from report import CsvWriter, FindingSink, JsonlWriter, ParquetWriter, TextReport
+from scan import check_unit, diff_unit, run_check, scan_units
+from state import StateStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# Required labels to check
-LABELS_MAP = {
-    'one': 'fruit',
-    'yes': '123',
-    'no': 'vegetable'
-}
-
-# Locations for Artifact Registry and Dataproc Metastore
+# Fallback locations for Artifact Registry and Dataproc Metastore, when they cannot be discovered
 LOCATIONS = ["us-central1", "us-east1"]
 
-
-def check_storage_labels(project_id, file):
-    file.write("\n=== Buckets ===\n")
-    try:
-        client = storage.Client(project=project_id)
-        buckets = list(client.list_buckets(project=project_id))
-        found = False
-        for bucket in buckets:
-            labels = bucket.labels or {}
-            missing = [k for k, v in LABELS_MAP.items() if labels.get(k) != v]
-            if missing:
-                found = True
-                file.write(f"{bucket.name} - Missing labels: {missing}\n")
-        if not found:
-            file.write("All buckets have required labels.\n")
-    except GoogleAPICallError as e:
-        file.write(f"[Error] GCS - {e}\n")
-
-
-def check_bigquery_labels(project_id, file):
-    file.write("\n=== BigQuery Datasets ===\n")
-    try:
-        client = bigquery.Client(project=project_id)
-        datasets = list(client.list_datasets())
-        found = False
-        for dataset_ref in datasets:
-            dataset = client.get_dataset(dataset_ref.dataset_id)
-            labels = dataset.labels or {}
-            missing = [k for k, v in LABELS_MAP.items() if labels.get(k) != v]
-            if missing:
-                found = True
-                file.write(f"{dataset.dataset_id} - Missing labels: {missing}\n")
-        if not found:
-            file.write("All datasets have required labels.\n")
-    except GoogleAPICallError as e:
-        file.write(f"[Error] BigQuery - {e}\n")
-
-
-def check_artifact_labels(project_id, file):
-    file.write("\n=== Artifact Registry Repos ===\n")
-    client = artifactregistry_v1.ArtifactRegistryClient()
-    try:
-        found = False
-        for location in LOCATIONS:
-            parent = f"projects/{project_id}/locations/{location}"
-            repos = client.list_repositories(parent=parent)
-            for repo in repos:
-                labels = repo.labels or {}
-                missing = [k for k, v in LABELS_MAP.items() if labels.get(k) != v]
-                if missing:
-                    found = True
-                    name = repo.name.split("/")[-1]
-                    file.write(f"{name} - Missing labels: {missing}\n")
-        if not found:
-            file.write("All repos have required labels.\n")
-    except GoogleAPICallError as e:
-        file.write(f"[Error] Artifact Registry - {e}\n")
-
-
-def check_dataproc_metastore_labels(project_id, file):
-    file.write("\n=== Dataproc Metastore Services ===\n")
-    client = metastore_v1.DataprocMetastoreClient()
-    try:
-        found = False
-        for location in LOCATIONS:
-            parent = f"projects/{project_id}/locations/{location}"
-            services = client.list_services(parent=parent)
-            for service in services:
-                labels = service.labels or {}
-                missing = [k for k, v in LABELS_MAP.items() if labels.get(k) != v]
-                if missing:
-                    found = True
-                    name = service.name.split("/")[-1]
-                    file.write(f"{name} - Missing labels: {missing}\n")
-        if not found:
-            file.write("All metastore services have required labels.\n")
-    except GoogleAPICallError as e:
-        file.write(f"[Error] Metastore - {e}\n")
-
-
-def check_pubsub_labels(project_id, file):
-    file.write("\n=== Pub/Sub Subscriptions ===\n")
-    client = pubsub_v1.SubscriberClient()
-    try:
-        project_path = f"projects/{project_id}"
-        subs = client.list_subscriptions(request={"project": project_path})
-        found = False
-        for sub in subs:
-            labels = sub.labels or {}
-            missing = [k for k, v in LABELS_MAP.items() if labels.get(k) != v]
-            if missing:
-                found = True
-                name = sub.name.split("/")[-1]
-                file.write(f"{name} - Missing labels: {missing}\n")
-        if not found:
-            file.write("All subscriptions have required labels.\n")
-    except GoogleAPICallError as e:
-        file.write(f"[Error] Pub/Sub - {e}\n")
+# Requests per second allowed against each API (override with SCAN_RATE_<SERVICE>)
+RATE_LIMITS = {
+    'storage': 20,
+    'bigquery': 20,
+    'artifactregistry': 10,
+    'metastore': 5,
+    'pubsub': 20,
+}
 
 
 if __name__ == "__main__":
@@ -123,20 +37,86 @@ if __name__ == "__main__":
         'apps-aa218',
     ]
 
-    # ✅ Output file path
-    OUTPUT_FILE = "label_check_output.txt"
-
-    # ✅ Write output to UTF-8 encoded file
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as file:
-        for project_id in PROJECT_IDS:
-            file.write("\n" + "=" * 60 + "\n")
-            file.write(f"Checking project: {project_id}\n")
-            file.write("=" * 60 + "\n")
-
-            check_storage_labels(project_id, file)
-            check_bigquery_labels(project_id, file)
-            check_artifact_labels(project_id, file)
-            check_dataproc_metastore_labels(project_id, file)
-            check_pubsub_labels(project_id, file)
-
-            file.write(f"\nCompleted check for: {project_id}\n")
+    parser = argparse.ArgumentParser(description="Report resources that break the label policy")
+    parser.add_argument("--policy", default=DEFAULT_PATH, help="label policy file")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="report only newly non-compliant, fixed and deleted resources since the last run",
+    )
+    parser.add_argument("--state", default="label_state.db", help="state file of --incremental")
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="also fix the labels of non-compliant resources, while they are being listed",
+    )
+    parser.add_argument("--write-workers", type=int, default=MAX_WORKERS, help="concurrent writes of --fix")
+    parser.add_argument("--retries", type=int, default=RETRIES, help="retries per write of --fix on quota errors")
+    parser.add_argument("--text", default="label_check_output.txt", help="text report ('' for none)")
+    parser.add_argument("--jsonl", help="also stream findings to this JSON Lines file")
+    parser.add_argument("--csv", help="also stream findings to this CSV file")
+    parser.add_argument("--parquet", help="also write findings to this Parquet file (needs pyarrow)")
+    add_arguments(parser, checkpoint="label_check.checkpoint")
+    parser.add_argument(
+        "--location-cache", default="locations_cache.json", help="discovered and empty locations, kept for a day"
+    )
+    args = parser.parse_args()
+    if args.resume and args.parquet:
+        parser.error("--parquet cannot be appended to; use --jsonl or --csv with --resume")
+    project_ids = project_ids_from(args, PROJECT_IDS)
+
+    providers = gcp_providers(limiters_from_env(RATE_LIMITS))
+    policy = Policy.load(args.policy)
+    state = StateStore(args.state) if args.incremental else None
+    job = "list" + ("-incremental" if args.incremental else "") + ("-fix" if args.fix else "")
+    checkpoint = Checkpoint(args.checkpoint, job, args.resume)
+    # ✅ With --fix, writes run on their own pool from the listed pages; a unit is checkpointed once they are done
+    fixes = None
+    progress = checkpoint
+    if args.fix:
+        progress = PendingUnits(checkpoint)
+        fixes = Remediator(
+            providers, args.write_workers, args.retries,
+            on_queued=lambda change: progress.queued(change.unit),
+            on_result=lambda change, outcome: progress.finished(change.unit, outcome == "applied"),
+        )
+    if state is not None:
+        check = functools.partial(diff_unit, providers, policy, state, fixes=fixes)
+    else:
+        check = functools.partial(check_unit, providers, policy, fixes=fixes)
+    # ✅ Discover the locations in use, concurrently; empty ones are skipped until the cache expires
+    location_cache = LocationCache(args.location_cache)
+    locations = discover_locations(project_ids, providers, location_cache, LOCATIONS)
+    units = checkpoint.remaining(scan_units(project_ids, providers, locations))
+    if checkpoint.completed:
+        logging.info(f"Resuming: {len(checkpoint.completed)} units already done, {len(units)} to go")
+
+    # ✅ Findings are written as they are found, in UTF-8; a resumed run appends
+    writers = []
+    if args.text:
+        empty = "No changes since the last scan.\n" if state is not None else None
+        writers.append(TextReport(args.text, providers, units, empty, append=args.resume))
+    if args.jsonl:
+        writers.append(JsonlWriter(args.jsonl, append=args.resume))
+    if args.csv:
+        writers.append(CsvWriter(args.csv, append=args.resume))
+    if args.parquet:
+        writers.append(ParquetWriter(args.parquet))
+    sink = FindingSink(writers)
+
+    # ✅ Scan every (project, service, location) concurrently
+    start = time.perf_counter()
+    summary = None
+    try:
+        run_units(units, functools.partial(run_check, check, sink, checkpoint=progress))
+    finally:
+        sink.close()
+        if fixes is not None:
+            summary = fixes.close()
+        checkpoint.close()
+        location_cache.save()
+        if state is not None:
+            state.close()
+    logging.info(f"Scanned {len(units)} units in {time.perf_counter() - start:.1f}s, {sink.count} findings")
+    if summary is not None:
+        logging.info(f"✅ Label remediation complete: {summary}")
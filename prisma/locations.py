@@ -0,0 +1,98 @@
+"""Location discovery for regional services, cached in a local JSON file.
+
+For every project and regional service the cache keeps the locations the
+API offers, and which of them held no resources at the last scan. Both
+expire after ``ttl_seconds``; until then, discovery is not repeated and
+empty locations are skipped. Providers that cannot discover locations,
+or whose discovery fails, fall back to a static list.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from engine import MAX_WORKERS, run_units
+from provider import Provider, ProviderError
+
+TTL_SECONDS = float(os.getenv("LOCATION_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+
+class LocationCache:
+    def __init__(self, path: str = "locations_cache.json", ttl_seconds: float = TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        self._lock = threading.Lock()
+
+    def locations(self, provider: Provider, project_id: str, fallback: list[str]) -> list[str]:
+        """The locations of ``project_id`` to scan for ``provider``'s service."""
+        key = f"{project_id}/{provider.service}"
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or now - entry["discovered_at"] > self.ttl_seconds:
+            try:
+                discovered = provider.list_locations(project_id)
+            except ProviderError as e:
+                logging.warning(f"Location discovery failed for {key}, using the fallback: {e}")
+                discovered = None
+            if discovered is None:
+                return fallback
+            # Empty marks expire on their own schedule, not with the discovery
+            old = entry["empty"] if entry is not None else {}
+            empty = {location: marked for location, marked in old.items() if location in discovered}
+            entry = {"discovered": sorted(discovered), "discovered_at": now, "empty": empty}
+            with self._lock:
+                self._entries[key] = entry
+        empty = entry["empty"]
+        return [
+            location for location in entry["discovered"]
+            if now - empty.get(location, 0) > self.ttl_seconds
+        ]
+
+    def record(self, service: str, project_id: str, location: str | None, count: int) -> None:
+        """Remember whether a completed listing of a location found anything."""
+        if location is None:
+            return
+        with self._lock:
+            entry = self._entries.get(f"{project_id}/{service}")
+            if entry is None:
+                return
+            if count:
+                entry["empty"].pop(location, None)
+            else:
+                entry["empty"][location] = time.time()
+
+    def save(self) -> None:
+        with self._lock:
+            data = json.dumps(self._entries, indent=1, sort_keys=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(self.path + ".tmp", self.path)
+
+
+def discover_locations(
+    project_ids, providers: dict[str, Provider], cache: LocationCache, fallback: list[str],
+    max_workers: int = MAX_WORKERS,
+) -> dict[tuple[str, str], list[str]]:
+    """(project, service) → locations to scan, for every regional service, discovered concurrently.
+
+    Also makes the providers report empty locations back to the cache.
+    """
+    pairs = [
+        (project_id, service)
+        for project_id in project_ids
+        for service, provider in providers.items()
+        if provider.info.regional
+    ]
+    for provider in providers.values():
+        provider.on_listed = cache.record
+    found = run_units(
+        pairs, lambda pair: cache.locations(providers[pair[1]], pair[0], fallback), max_workers
+    )
+    return dict(zip(pairs, found))
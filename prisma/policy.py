@@ -0,0 +1,142 @@
+"""Label policy: which labels resources must, may not, or must match, loaded from a JSON file.
+
+A policy file looks like::
+
+    {
+        "required": {"team": "data"},
+        "derived": {"project_id": "{project_id}"},
+        "patterns": {"owner": {"regex": "^[a-z.]+$", "default": "unassigned"}},
+        "forbidden": ["temp"],
+        "services": {"bigquery": {"required": {"tier": "analytics"}}},
+        "projects": {"apps-aa218": {"forbidden": [], "services": {...}}}
+    }
+
+``derived`` values are templates over ``{project_id}`` and ``{service}``.
+A ``patterns`` entry is a regex, or a regex with the ``default`` written
+when remediating. Overrides apply in the order base, ``services``,
+``projects``, then the project's own ``services``; a ``null`` value drops
+a required, derived or pattern label, and ``forbidden`` lists replace the
+inherited one.
+
+Every (project, service) pair is compiled once into a ``Matcher`` that the
+scan and the remediation both use.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import NamedTuple
+
+RULES = ("required", "derived", "patterns", "forbidden")
+
+# Shared by list.py and tag.py
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "label_policy.json")
+
+
+class Violations(NamedTuple):
+    # Required, derived or pattern labels that are absent or wrong
+    missing: list[str]
+    # Labels present that may not be
+    forbidden: list[str]
+
+
+class Matcher:
+    """A policy compiled for one project and service."""
+
+    def __init__(self, required: dict[str, str], patterns: dict[str, tuple[str, str | None]], forbidden):
+        self.required = required
+        self.patterns = {key: (re.compile(regex), default) for key, (regex, default) in patterns.items()}
+        self.forbidden = frozenset(forbidden)
+        self._required_items = frozenset(required.items())
+        self.fingerprint = hashlib.sha1(
+            json.dumps([required, patterns, sorted(self.forbidden)], sort_keys=True).encode()
+        ).hexdigest()[:16]
+
+    def check(self, labels: dict[str, str]) -> Violations | None:
+        """The labels' violations, or None when they comply."""
+        # Fast path for the common compliant resource: one subset test plus the few patterns
+        if (
+            labels.items() >= self._required_items
+            and self.forbidden.isdisjoint(labels)
+            and all(key in labels and regex.fullmatch(labels[key]) for key, (regex, _) in self.patterns.items())
+        ):
+            return None
+        missing = [key for key, value in self.required.items() if labels.get(key) != value]
+        missing += [
+            key for key, (regex, _) in self.patterns.items()
+            if key not in labels or not regex.fullmatch(labels[key])
+        ]
+        return Violations(missing, sorted(self.forbidden.intersection(labels)))
+
+    def check_page(self, page: list[dict[str, str]]) -> list[Violations | None]:
+        """``check`` over the labels of a page of resources."""
+        check = self.check
+        return [check(labels) for labels in page]
+
+    def fix(self, labels: dict[str, str]) -> dict[str, str] | None:
+        """The labels a resource should have, or None when nothing can or needs to change.
+
+        Pattern labels without a ``default`` are reported but not fixed.
+        """
+        if self.check(labels) is None:
+            return None
+        fixed = {key: value for key, value in labels.items() if key not in self.forbidden}
+        fixed.update(self.required)
+        for key, (regex, default) in self.patterns.items():
+            if default is not None and not (key in fixed and regex.fullmatch(fixed[key])):
+                fixed[key] = default
+        return fixed if fixed != labels else None
+
+
+def _merge(rules: dict, override: dict) -> dict:
+    merged = {key: dict(rules[key]) for key in ("required", "derived", "patterns")}
+    for key in ("required", "derived", "patterns"):
+        for label, value in (override.get(key) or {}).items():
+            if value is None:
+                merged[key].pop(label, None)
+            else:
+                merged[key][label] = value
+    merged["forbidden"] = list(override.get("forbidden", rules["forbidden"]))
+    return merged
+
+
+class Policy:
+    def __init__(self, config: dict):
+        unknown = set(config) - {*RULES, "services", "projects"}
+        if unknown:
+            raise ValueError(f"Unknown policy keys: {sorted(unknown)}")
+        self.config = config
+        self._base = _merge({"required": {}, "derived": {}, "patterns": {}, "forbidden": []}, config)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Policy":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def matcher(self, project_id: str, service: str) -> Matcher:
+        """The compiled policy for one project and service; compiled once and reused."""
+        with self._lock:
+            return self._compile(project_id, service)
+
+    @functools.lru_cache(maxsize=None)
+    def _compile(self, project_id: str, service: str) -> Matcher:
+        project = self.config.get("projects", {}).get(project_id, {})
+        rules = self._base
+        for override in (
+            self.config.get("services", {}).get(service, {}),
+            project,
+            project.get("services", {}).get(service, {}),
+        ):
+            rules = _merge(rules, override)
+        required = dict(rules["required"])
+        for key, template in rules["derived"].items():
+            required[key] = template.format(project_id=project_id, service=service)
+        patterns = {
+            key: (rule, None) if isinstance(rule, str) else (rule["regex"], rule.get("default"))
+            for key, rule in rules["patterns"].items()
+        }
+        return Matcher(required, patterns, rules["forbidden"])
@@ -0,0 +1,38 @@
+"""Project lists for org-wide runs: read from a file or stdin and split into shards."""
+
+import argparse
+import sys
+import zlib
+
+
+def read_projects(path: str) -> list[str]:
+    """One project ID per line of ``path`` (``-`` for stdin); blank lines and ``#`` comments are skipped."""
+    file = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        projects = [line.split("#", 1)[0].strip() for line in file]
+    finally:
+        if file is not sys.stdin:
+            file.close()
+    # Keep the first occurrence of duplicates
+    return list(dict.fromkeys(project for project in projects if project))
+
+
+def shard(project_ids: list[str], spec: str) -> list[str]:
+    """The projects of shard ``i/n`` (0-based); stable across machines and runs."""
+    index, count = (int(part) for part in spec.split("/"))
+    if not 0 <= index < count:
+        raise ValueError(f"Shard {spec} is not between 0/{count} and {count - 1}/{count}")
+    return [project for project in project_ids if zlib.crc32(project.encode()) % count == index]
+
+
+def add_arguments(parser: argparse.ArgumentParser, checkpoint: str) -> None:
+    """The project list, sharding and checkpoint options shared by list.py and tag.py."""
+    parser.add_argument("--projects", help="file with one project ID per line, '-' for stdin")
+    parser.add_argument("--shard", help="only the projects of shard i/n, e.g. 0/4, to split a run over machines")
+    parser.add_argument("--checkpoint", default=checkpoint, help="progress file, rewritten unless --resume")
+    parser.add_argument("--resume", action="store_true", help="skip the units the checkpoint has finished")
+
+
+def project_ids_from(args, default: list[str]) -> list[str]:
+    project_ids = read_projects(args.projects) if args.projects else default
+    return shard(project_ids, args.shard) if args.shard else project_ids
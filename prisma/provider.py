@@ -0,0 +1,139 @@
+"""Resource providers: one interface to list resources and read or write their labels.
+
+A provider covers one service (GCS, BigQuery, ...) and knows nothing about
+label policy; the scan and remediation loops only talk to providers. The
+Google Cloud implementations live in ``gcp_providers.py`` and in-memory
+fakes for tests and benchmarks in ``fake_providers.py``.
+"""
+
+from typing import Any, Iterator, NamedTuple
+
+
+class ServiceInfo(NamedTuple):
+    # Name in error and log lines
+    label: str
+    # Report section heading
+    heading: str
+    # Plural and singular resource nouns
+    noun: str
+    kind: str
+    # Whether resources are listed per location
+    regional: bool
+
+
+# Report order
+SERVICES = {
+    'storage': ServiceInfo("GCS", "Buckets", "buckets", "bucket", False),
+    'bigquery': ServiceInfo("BigQuery", "BigQuery Datasets", "datasets", "dataset", False),
+    'artifactregistry': ServiceInfo("Artifact Registry", "Artifact Registry Repos", "repos", "repo", True),
+    'metastore': ServiceInfo(
+        "Metastore", "Dataproc Metastore Services", "metastore services", "service", True
+    ),
+    'pubsub': ServiceInfo("Pub/Sub", "Pub/Sub Subscriptions", "subscriptions", "sub", False),
+}
+
+
+class Resource(NamedTuple):
+    # Short name, as shown in reports
+    name: str
+    labels: dict[str, str]
+    # The provider's own object, handed back on write
+    handle: Any = None
+    # Changes whenever the resource does (etag or update time), if the API has one
+    version: str | None = None
+
+
+class ProviderError(Exception):
+    """An API call of a provider failed."""
+
+
+class QuotaError(ProviderError):
+    """The API is rate limiting or temporarily unavailable; the call can be retried after a while."""
+
+
+class ConflictError(ProviderError):
+    """A conditional write failed because the resource changed after it was listed."""
+
+
+def label_patch(old: dict[str, str], new: dict[str, str]) -> dict[str, str | None]:
+    """The update that turns labels ``old`` into ``new`` for APIs that merge labels, like BigQuery's PATCH.
+
+    Keys to remove are sent as None; leaving them out would keep them.
+    """
+    return {**new, **{key: None for key in old.keys() - new.keys()}}
+
+
+def check_written(resource: Resource, written: dict[str, str], labels: dict[str, str]) -> None:
+    """Raise if the labels a write left on ``resource`` are not the ones it was meant to write."""
+    if written != labels:
+        raise ProviderError(f"Labels of '{resource.name}' are {written} after the write, not {labels}")
+
+
+class Provider:
+    """Lists one service's resources and writes their labels.
+
+    Subclasses set ``service`` and implement ``_list`` and ``_write``, and
+    ``_list_locations`` if the service is regional and can list its
+    locations. Exceptions of the types in ``errors`` are raised as
+    ``ProviderError``, or as ``QuotaError`` / ``ConflictError`` if they are
+    also in ``quota_errors`` / ``conflict_errors``.
+
+    ``on_listed(service, project_id, location, count)``, if set, is called
+    after every listing that ran to completion.
+    """
+
+    service = ""
+    errors: tuple[type[Exception], ...] = ()
+    quota_errors: tuple[type[Exception], ...] = ()
+    conflict_errors: tuple[type[Exception], ...] = ()
+    on_listed = None
+
+    @property
+    def info(self) -> ServiceInfo:
+        return SERVICES[self.service]
+
+    def list_resources(self, project_id: str, location: str | None = None) -> Iterator[Resource]:
+        """Yield the resources of a project (in ``location`` for regional services), page by page."""
+        count = 0
+        try:
+            for resource in self._list(project_id, location):
+                count += 1
+                yield resource
+        except self.errors as e:
+            raise self._error(e) from e
+        if self.on_listed is not None:
+            self.on_listed(self.service, project_id, location, count)
+
+    def list_locations(self, project_id: str) -> list[str] | None:
+        """The IDs of the locations the service offers the project, or None if it cannot tell."""
+        try:
+            return self._list_locations(project_id)
+        except self.errors as e:
+            raise self._error(e) from e
+
+    def write_labels(self, project_id: str, resource: Resource, labels: dict[str, str]) -> None:
+        """Replace the labels of ``resource`` with ``labels``.
+
+        Where the API supports it the write is conditional on the resource
+        being unchanged since it was listed.
+        """
+        try:
+            self._write(project_id, resource, labels)
+        except self.errors as e:
+            raise self._error(e) from e
+
+    def _error(self, e: Exception) -> ProviderError:
+        if isinstance(e, self.conflict_errors):
+            return ConflictError(str(e))
+        if isinstance(e, self.quota_errors):
+            return QuotaError(str(e))
+        return ProviderError(str(e))
+
+    def _list(self, project_id: str, location: str | None) -> Iterator[Resource]:
+        raise NotImplementedError
+
+    def _write(self, project_id: str, resource: Resource, labels: dict[str, str]) -> None:
+        raise NotImplementedError
+
+    def _list_locations(self, project_id: str) -> list[str] | None:
+        return None
@@ -0,0 +1,220 @@
+"""Label remediation over resource providers: plan the missing labels, then apply the plan.
+
+Planning lists every unit concurrently and records, per resource, the
+labels it should have. The plan can be printed as a dry run, or applied
+on the scan engine's pool: writes go through the providers' rate
+limiters, quota errors are retried with exponential backoff, and a
+resource that changed since it was listed is skipped rather than
+overwritten.
+
+A ``Remediator`` applies changes the same way as a scan queues them, so
+a single listing both reports and fixes (see ``scan.check_unit``).
+"""
+
+import functools
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from engine import BATCH_SIZE, MAX_WORKERS, Unit, batched, run_units
+from policy import Matcher, Policy
+from provider import ConflictError, Provider, ProviderError, QuotaError, Resource
+
+RETRIES = 5
+# Changes a Remediator holds before queuing blocks the scan
+MAX_PENDING = 10_000
+BASE_DELAY_SECONDS = 0.5
+MAX_DELAY_SECONDS = 30.0
+
+
+class Change(NamedTuple):
+    unit: Unit
+    resource: Resource
+    # The complete label set to write
+    labels: dict[str, str]
+
+    def diff(self) -> dict[str, tuple[str | None, str | None]]:
+        """Label → (current value, new value) for every label the change sets or removes."""
+        old = self.resource.labels
+        diff = {k: (old.get(k), v) for k, v in self.labels.items() if old.get(k) != v}
+        diff.update({k: (v, None) for k, v in old.items() if k not in self.labels})
+        return diff
+
+
+class Plan(NamedTuple):
+    changes: list[Change]
+    # Resources looked at
+    checked: int
+    # Units whose listing failed, with the error
+    errors: list[tuple[Unit, str]]
+
+
+def plan_unit(providers: dict[str, Provider], policy: Policy, unit: Unit) -> Plan:
+    provider = providers[unit.service]
+    matcher = policy.matcher(unit.project_id, unit.service)
+    changes = []
+    checked = 0
+    try:
+        for batch in batched(provider.list_resources(unit.project_id, unit.location), BATCH_SIZE):
+            checked += len(batch)
+            for resource, violations in zip(batch, matcher.check_page([r.labels for r in batch])):
+                labels = matcher.fix(resource.labels) if violations else None
+                if labels is not None:
+                    changes.append(Change(unit, resource, labels))
+    except ProviderError as e:
+        where = f"{unit.project_id}/{unit.location}" if unit.location else unit.project_id
+        return Plan(changes, checked, [(unit, f"[{provider.info.label}] Error listing {where}: {e}")])
+    return Plan(changes, checked, [])
+
+
+def build_plan(providers: dict[str, Provider], policy: Policy, units, max_workers: int = MAX_WORKERS) -> Plan:
+    """Plan every unit concurrently; changes come in the order of ``units``."""
+    plans = run_units(units, functools.partial(plan_unit, providers, policy), max_workers)
+    return Plan(
+        [change for plan in plans for change in plan.changes],
+        sum(plan.checked for plan in plans),
+        [error for plan in plans for error in plan.errors],
+    )
+
+
+def format_change(providers: dict[str, Provider], change: Change) -> str:
+    info = providers[change.unit.service].info
+    where = change.unit.project_id + (f"/{change.unit.location}" if change.unit.location else "")
+    diff = ", ".join(f"{k}: {old!r} → {new!r}" for k, (old, new) in change.diff().items())
+    return f"[{info.label}] {info.kind} '{change.resource.name}' ({where}): {diff}"
+
+
+def apply_change(
+    providers: dict[str, Provider], change: Change, retries: int = RETRIES
+) -> tuple[str, float, int]:
+    """Write one change, backing off on quota errors.
+
+    Returns:
+        The outcome (applied, skipped or failed), the seconds it took and the number of retries.
+    """
+    provider = providers[change.unit.service]
+    label = provider.info.label
+    start = time.perf_counter()
+    for attempt in range(retries + 1):
+        try:
+            provider.write_labels(change.unit.project_id, change.resource, change.labels)
+        except ConflictError as e:
+            logging.warning(
+                f"[{label}] Skipped {provider.info.kind} '{change.resource.name}', changed since listed: {e}"
+            )
+            return "skipped", time.perf_counter() - start, attempt
+        except QuotaError as e:
+            if attempt < retries:
+                # Full jitter, so throttled workers do not retry in lockstep
+                time.sleep(random.uniform(0, min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * 2 ** attempt)))
+                continue
+            logging.error(f"[{label}] Gave up on {provider.info.kind} '{change.resource.name}': {e}")
+            return "failed", time.perf_counter() - start, attempt
+        except ProviderError as e:
+            logging.error(f"[{label}] Error updating {provider.info.kind} '{change.resource.name}': {e}")
+            return "failed", time.perf_counter() - start, attempt
+        logging.info(f"[{label}] Added labels to {provider.info.kind} '{change.resource.name}': {change.labels}")
+        return "applied", time.perf_counter() - start, attempt
+
+
+def apply_plan(
+    providers: dict[str, Provider],
+    changes: list[Change],
+    max_workers: int = MAX_WORKERS,
+    retries: int = RETRIES,
+    on_result=None,
+) -> dict:
+    """Apply every change concurrently, calling ``on_result(change, outcome)`` after each one.
+
+    Returns:
+        Counts of applied, skipped and failed changes, retries and timings.
+    """
+
+    def apply(change):
+        result = apply_change(providers, change, retries)
+        if on_result is not None:
+            on_result(change, result[0])
+        return result
+
+    start = time.perf_counter()
+    results = run_units(changes, apply, max_workers)
+    return _summary(results, time.perf_counter() - start)
+
+
+class Remediator:
+    """Applies changes on a pool of its own as a scan queues them, so listing never waits on writes.
+
+    At most ``max_pending`` changes are held; past that, ``submit`` blocks
+    until the writes catch up. ``on_queued(change)`` is called before a
+    change is queued and ``on_result(change, outcome)`` after it is applied.
+    """
+
+    def __init__(
+        self,
+        providers: dict[str, Provider],
+        max_workers: int = MAX_WORKERS,
+        retries: int = RETRIES,
+        on_queued=None,
+        on_result=None,
+        max_pending: int = MAX_PENDING,
+    ):
+        self.providers = providers
+        self.retries = retries
+        self.on_queued = on_queued
+        self.on_result = on_result
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="write")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._results = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def fix(self, unit: Unit, resource: Resource, matcher: Matcher) -> None:
+        """Queue the write that brings ``resource`` in line with ``matcher``, if one can."""
+        labels = matcher.fix(resource.labels)
+        if labels is not None:
+            self.submit(Change(unit, resource, labels))
+
+    def submit(self, change: Change) -> None:
+        self._slots.acquire()
+        if self.on_queued is not None:
+            self.on_queued(change)
+        self._pool.submit(self._apply, change)
+
+    def close(self) -> dict:
+        """Wait for the queued changes; returns the same summary as ``apply_plan``."""
+        self._pool.shutdown()
+        return _summary(self._results, time.perf_counter() - self._start)
+
+    def _apply(self, change: Change) -> None:
+        start = time.perf_counter()
+        try:
+            result = apply_change(self.providers, change, self.retries)
+        except Exception:
+            # Nobody waits on this future; recorded here, the change still counts in the summary
+            logging.exception(f"Unexpected error writing the labels of '{change.resource.name}'")
+            result = ("failed", time.perf_counter() - start, 0)
+        try:
+            with self._lock:
+                self._results.append(result)
+            if self.on_result is not None:
+                self.on_result(change, result[0])
+        finally:
+            self._slots.release()
+
+
+def _summary(results: list[tuple[str, float, int]], elapsed: float) -> dict:
+    outcomes = Counter(outcome for outcome, _, _ in results)
+    latencies = sorted(seconds for _, seconds, _ in results)
+    return {
+        "applied": outcomes["applied"],
+        "skipped": outcomes["skipped"],
+        "failed": outcomes["failed"],
+        "retries": sum(attempts for _, _, attempts in results),
+        "seconds": round(elapsed, 3),
+        "write_p50_seconds": round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+        "write_p95_seconds": round(latencies[int(len(latencies) * 0.95)], 3) if latencies else 0.0,
+    }
@@ -0,0 +1,249 @@
+"""Streaming scan output: findings go to JSONL, CSV, Parquet and the text report as they are found.
+
+Workers hand every finding to a ``FindingSink`` the moment they see it, so
+nothing but the page being scanned is held in memory. The structured
+writers append one record per finding and flush at least every
+``FLUSH_SECONDS`` and at the end of every unit, so other tools can follow
+the files while a scan runs. Their records are in completion order; each
+one says which project, service and location it belongs to. The text
+report keeps its project, service and location order, holding back only
+the lines of units that finished ahead of an earlier one.
+"""
+
+import csv
+import json
+import logging
+import threading
+import time
+from typing import NamedTuple
+
+from engine import Unit
+from provider import Provider
+
+FLUSH_SECONDS = 1.0
+BUFFER_BYTES = 1 << 16
+
+
+class Finding(NamedTuple):
+    project_id: str
+    service: str
+    location: str | None
+    # Resource name; empty for errors
+    name: str
+    # missing, newly_missing, fixed, deleted or error
+    status: str
+    missing: list[str] = []
+    forbidden: list[str] = []
+    # The error message, for errors
+    detail: str = ""
+
+    @classmethod
+    def for_unit(cls, unit: Unit, name: str, status: str, violations=None, detail: str = "") -> "Finding":
+        missing, forbidden = violations or ([], [])
+        return cls(unit.project_id, unit.service, unit.location, name, status, missing, forbidden, detail)
+
+
+def format_line(providers: dict[str, Provider], finding: Finding) -> str:
+    """The finding as a line of the text report."""
+    if finding.status == "error":
+        return f"[Error] {providers[finding.service].info.label} - {finding.detail}\n"
+    if finding.status in ("missing", "newly_missing"):
+        parts = []
+        if finding.missing:
+            newly = "Newly missing" if finding.status == "newly_missing" else "Missing"
+            parts.append(f"{newly} labels: {finding.missing}")
+        if finding.forbidden:
+            parts.append(f"Forbidden labels: {finding.forbidden}")
+        return f"{finding.name} - {'; '.join(parts)}\n"
+    return f"{finding.name} - {finding.status.capitalize()}\n"
+
+
+class _FileWriter:
+    def __init__(self, path: str, append: bool = False):
+        self.file = open(path, "a" if append else "w", encoding="utf-8", newline="", buffering=BUFFER_BYTES)
+        self._flushed = time.monotonic()
+
+    def unit_done(self, unit: Unit) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        self.file.flush()
+        self._flushed = time.monotonic()
+
+    def _maybe_flush(self) -> None:
+        if time.monotonic() - self._flushed > FLUSH_SECONDS:
+            self.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class JsonlWriter(_FileWriter):
+    def write(self, finding: Finding) -> None:
+        self.file.write(json.dumps(finding._asdict()) + "\n")
+        self._maybe_flush()
+
+
+class CsvWriter(_FileWriter):
+    def __init__(self, path: str, append: bool = False):
+        super().__init__(path, append)
+        self._csv = csv.writer(self.file)
+        if not self.file.tell():
+            self._csv.writerow(Finding._fields)
+
+    def write(self, finding: Finding) -> None:
+        self._csv.writerow(
+            finding._replace(missing=";".join(finding.missing), forbidden=";".join(finding.forbidden))
+        )
+        self._maybe_flush()
+
+
+class ParquetWriter:
+    """Writes findings as Parquet row groups of ``batch_size`` rows; needs ``pyarrow``."""
+
+    def __init__(self, path: str, batch_size: int = 10_000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("project_id", pa.string()),
+                ("service", pa.string()),
+                ("location", pa.string()),
+                ("name", pa.string()),
+                ("status", pa.string()),
+                ("missing", pa.list_(pa.string())),
+                ("forbidden", pa.list_(pa.string())),
+                ("detail", pa.string()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._batch_size = batch_size
+        self._rows: list[Finding] = []
+
+    def write(self, finding: Finding) -> None:
+        self._rows.append(finding)
+        if len(self._rows) >= self._batch_size:
+            self.flush()
+
+    def unit_done(self, unit: Unit) -> None:
+        # Row groups of whole batches; Parquet is read once the file is closed anyway
+        pass
+
+    def flush(self) -> None:
+        if self._rows:
+            rows = [row._asdict() for row in self._rows]
+            self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+            self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+class TextReport:
+    """The text report, written section by section in ``units`` order as units finish."""
+
+    def __init__(
+        self,
+        path: str,
+        providers: dict[str, Provider],
+        units: list[Unit],
+        empty: str | None = None,
+        append: bool = False,
+    ):
+        self.file = open(path, "a" if append else "w", encoding="utf-8", buffering=BUFFER_BYTES)
+        self.providers = providers
+        self.units = units
+        self.empty = empty
+        self._lines: dict[Unit, list[str]] = {}
+        self._done: set[Unit] = set()
+        self._next = 0
+        self._section_lines = 0
+
+    def write(self, finding: Finding) -> None:
+        unit = Unit(finding.project_id, finding.service, finding.location)
+        self._lines.setdefault(unit, []).append(format_line(self.providers, finding))
+
+    def unit_done(self, unit: Unit) -> None:
+        self._done.add(unit)
+        while self._next < len(self.units) and self.units[self._next] in self._done:
+            self._write_unit(self._next)
+            self._next += 1
+        self.file.flush()
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def _write_unit(self, index: int) -> None:
+        unit = self.units[index]
+        before = self.units[index - 1] if index else None
+        after = self.units[index + 1] if index + 1 < len(self.units) else None
+        new_project = before is None or before.project_id != unit.project_id
+        end_of_project = after is None or after.project_id != unit.project_id
+        if new_project:
+            self.file.write("\n" + "=" * 60 + "\n")
+            self.file.write(f"Checking project: {unit.project_id}\n")
+            self.file.write("=" * 60 + "\n")
+        if new_project or before.service != unit.service:
+            self.file.write(f"\n=== {self.providers[unit.service].info.heading} ===\n")
+            self._section_lines = 0
+
+        lines = self._lines.pop(unit, [])
+        self.file.writelines(lines)
+        self._section_lines += len(lines)
+
+        if (end_of_project or after.service != unit.service) and not self._section_lines:
+            noun = self.providers[unit.service].info.noun
+            self.file.write(self.empty or f"All {noun} have required labels.\n")
+        if end_of_project:
+            self.file.write(f"\nCompleted check for: {unit.project_id}\n")
+        self._done.discard(unit)
+
+
+class ErrorLog:
+    """Logs the errors among the findings, for runs that write no report."""
+
+    def __init__(self, providers: dict[str, Provider]):
+        self.providers = providers
+
+    def write(self, finding: Finding) -> None:
+        if finding.status == "error":
+            logging.error(f"❌ {format_line(self.providers, finding).rstrip()}")
+
+    def unit_done(self, unit: Unit) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FindingSink:
+    """Thread-safe fan-out of findings to every writer."""
+
+    def __init__(self, writers: list):
+        self.writers = writers
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def emit(self, finding: Finding) -> None:
+        with self._lock:
+            self.count += 1
+            for writer in self.writers:
+                writer.write(finding)
+
+    def unit_done(self, unit: Unit) -> None:
+        with self._lock:
+            for writer in self.writers:
+                writer.unit_done(unit)
+
+    def close(self) -> None:
+        for writer in self.writers:
+            writer.close()
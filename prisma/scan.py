@@ -0,0 +1,128 @@
+"""Label scan over resource providers: find resources that break the label policy.
+
+Resources are evaluated a batch at a time against the policy compiled for
+their project and service. The checks stream ``Finding``s to an ``emit``
+callback as they go (see ``report.py``) instead of collecting them.
+Given a ``Remediator``, they also queue the fix of every non-compliant
+resource from the same page, so one listing serves both the report and
+the remediation.
+"""
+
+from checkpoint import Checkpoint, PendingUnits
+from engine import BATCH_SIZE, Unit, batched
+from policy import Policy
+from provider import Provider, ProviderError
+from remediate import Remediator
+from report import Finding, FindingSink
+from state import StateStore, fingerprint
+
+
+def scan_units(project_ids, providers: dict[str, Provider], locations):
+    """Every (project, service, location) unit of a scan, in report order.
+
+    ``locations`` is the list of locations for every regional service, or a
+    dict of (project, service) → locations as ``discover_locations`` returns.
+    """
+    units = []
+    for project_id in project_ids:
+        for service, provider in providers.items():
+            if not provider.info.regional:
+                units.append(Unit(project_id, service, None))
+                continue
+            regional = locations if isinstance(locations, list) else locations[(project_id, service)]
+            for location in regional:
+                units.append(Unit(project_id, service, location))
+    return units
+
+
+def check_unit(
+    providers: dict[str, Provider], policy: Policy, emit, unit: Unit, fixes: Remediator | None = None
+) -> bool:
+    """Emit a finding for every resource of one unit that breaks the policy, and queue its fix.
+
+    Returns:
+        Whether the unit was listed completely.
+    """
+    provider = providers[unit.service]
+    matcher = policy.matcher(unit.project_id, unit.service)
+    try:
+        for batch in batched(provider.list_resources(unit.project_id, unit.location), BATCH_SIZE):
+            for resource, violations in zip(batch, matcher.check_page([r.labels for r in batch])):
+                if violations:
+                    emit(Finding.for_unit(unit, resource.name, "missing", violations))
+                    if fixes is not None:
+                        fixes.fix(unit, resource, matcher)
+    except ProviderError as e:
+        emit(Finding.for_unit(unit, "", "error", detail=str(e)))
+        return False
+    return True
+
+
+def diff_unit(
+    providers: dict[str, Provider],
+    policy: Policy,
+    state: StateStore,
+    emit,
+    unit: Unit,
+    fixes: Remediator | None = None,
+) -> bool:
+    """Emit what changed in one unit since the last scan, updating the state.
+
+    Resources whose version is unchanged are not evaluated again. Only newly
+    non-compliant, fixed and deleted resources are reported, but every
+    non-compliant one is fixed. A unit whose listing fails keeps its
+    previous state.
+
+    Returns:
+        Whether the unit was listed completely.
+    """
+    provider = providers[unit.service]
+    matcher = policy.matcher(unit.project_id, unit.service)
+    previous = state.load(unit)
+    seen = {}
+    findings = []
+    try:
+        for batch in batched(provider.list_resources(unit.project_id, unit.location), BATCH_SIZE):
+            changed = []
+            for resource in batch:
+                # A policy change invalidates every stored evaluation
+                version = f"{matcher.fingerprint}:{resource.version or fingerprint(resource.labels)}"
+                old = previous.get(resource.name)
+                if old is not None and old[0] == version:
+                    seen[resource.name] = old
+                    if old[1] and fixes is not None:
+                        fixes.fix(unit, resource, matcher)
+                else:
+                    changed.append((resource, version, old[1] if old is not None else []))
+            page = matcher.check_page([resource.labels for resource, _, _ in changed])
+            for (resource, version, was), violations in zip(changed, page):
+                now = list(violations) if violations else []
+                seen[resource.name] = (version, now)
+                if now and fixes is not None:
+                    fixes.fix(unit, resource, matcher)
+                if now and now != was:
+                    findings.append(Finding.for_unit(unit, resource.name, "newly_missing", violations))
+                elif not now and was:
+                    findings.append(Finding.for_unit(unit, resource.name, "fixed"))
+    except ProviderError as e:
+        emit(Finding.for_unit(unit, "", "error", detail=str(e)))
+        return False
+    for name in sorted(previous.keys() - seen.keys()):
+        findings.append(Finding.for_unit(unit, name, "deleted"))
+    state.save(unit, seen)
+    # Only once the state is saved, so a failed unit reports nothing
+    for finding in findings:
+        emit(finding)
+    return True
+
+
+def run_check(check, sink: FindingSink, unit: Unit, checkpoint: Checkpoint | PendingUnits | None = None) -> None:
+    """Run ``check(emit, unit)`` with the sink's ``emit``, then mark the unit done.
+
+    The unit is checkpointed only if it was listed completely, so a resumed
+    run lists it again.
+    """
+    listed = check(sink.emit, unit)
+    sink.unit_done(unit)
+    if checkpoint is not None and listed:
+        checkpoint.done(unit)
@@ -0,0 +1,73 @@
+"""Local SQLite state for incremental scans.
+
+For every resource seen by the last scan it keeps a version (the API's
+etag or update time where there is one, otherwise a fingerprint of the
+labels), its policy violations and when it was last seen. Workers of
+the scan engine share one connection behind a lock.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from engine import Unit
+
+# Bumped when the table changes; an older table is dropped, costing one full scan
+SCHEMA_VERSION = 2
+
+
+def fingerprint(labels: dict[str, str]) -> str:
+    return hashlib.sha1(json.dumps(labels, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class StateStore:
+    def __init__(self, path: str = "label_state.db"):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            if self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._db.execute("DROP TABLE IF EXISTS resources")
+                self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS resources (
+                    project_id TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    violations TEXT NOT NULL,
+                    last_seen REAL NOT NULL,
+                    PRIMARY KEY (project_id, service, location, name)
+                )"""
+            )
+
+    def load(self, unit: Unit) -> dict[str, tuple[str, list]]:
+        """Resource name → (version, violations) as of the last scan of ``unit``; ``[]`` if compliant."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, version, violations FROM resources"
+                " WHERE project_id = ? AND service = ? AND location = ?",
+                (unit.project_id, unit.service, unit.location or ""),
+            ).fetchall()
+        return {name: (version, json.loads(violations)) for name, version, violations in rows}
+
+    def save(self, unit: Unit, seen: dict[str, tuple[str, list]]) -> None:
+        """Replace the state of ``unit`` with the resources of a completed scan."""
+        key = (unit.project_id, unit.service, unit.location or "")
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM resources WHERE project_id = ? AND service = ? AND location = ?", key
+            )
+            self._db.executemany(
+                "INSERT INTO resources VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (*key, name, version, json.dumps(violations), now)
+                    for name, (version, violations) in seen.items()
+                ],
+            )
+
+    def close(self) -> None:
+        self._db.close()
@@ -1,151 +1,32 @@
-import os
+import argparse
+import functools
 import logging
-from google.cloud import storage, bigquery, pubsub_v1, metastore_v1
-from google.cloud import artifactregistry_v1
-from google.api_core.exceptions import GoogleAPICallError
-from google.protobuf import field_mask_pb2
+import time
+
+from engine import MAX_WORKERS, limiters_from_env, run_units
+from gcp_providers import gcp_providers
+from locations import LocationCache, discover_locations
+from checkpoint import Checkpoint, PendingUnits
+from policy import DEFAULT_PATH, Policy
+from projects import add_arguments, project_ids_from
+from remediate import RETRIES, Remediator, build_plan, format_change
+from report import ErrorLog, FindingSink
+from scan import check_unit, run_check, scan_units
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# Define the labels map to check (excluding project_id)
-LABELS_MAP = {
-    'abc': 'fruit',
-    'def': '123',
-    'ghi': 'vegetable'
-}
-
-# Define the list of locations to check
+# Fallback locations, when they cannot be discovered
 LOCATIONS = ["us-central1", "us-east1", "us-west1"]  # Add more locations as needed
 
-def check_storage_labels(project_id):
-    """Check and add all required labels to Cloud Storage buckets"""
-    storage_client = storage.Client(project=project_id)
-    try:
-        buckets = storage_client.list_buckets()
-        for bucket in buckets:
-            labels = bucket.labels or {}
-            modified = False
-
-            for key, value in LABELS_MAP.items():
-                if labels.get(key) != value:
-                    labels[key] = value
-                    modified = True
-
-            labels['project_id'] = project_id
-
-            if modified:
-                bucket.labels = labels
-                bucket.patch()
-                logging.info(f"[GCS] Added labels to bucket '{bucket.name}': {labels}")
-    except GoogleAPICallError as e:
-        logging.error(f"[GCS] Error: {e}")
-
-def check_bigquery_labels(project_id):
-    """Check and add all required labels to BigQuery datasets"""
-    bq_client = bigquery.Client(project=project_id)
-    try:
-        datasets = list(bq_client.list_datasets())
-        for dataset_ref in datasets:
-            dataset = bq_client.get_dataset(dataset_ref.dataset_id)
-            labels = dataset.labels or {}
-            modified = False
-
-            for key, value in LABELS_MAP.items():
-                if labels.get(key) != value:
-                    labels[key] = value
-                    modified = True
-
-            labels['project_id'] = project_id
-
-            if modified:
-                dataset.labels = labels
-                bq_client.update_dataset(dataset, ["labels"])
-                logging.info(f"[BigQuery] Added labels to dataset '{dataset.dataset_id}': {labels}")
-    except GoogleAPICallError as e:
-        logging.error(f"[BigQuery] Error: {e}")
-
-def check_artifact_labels(project_id):
-    """Check and add all required labels to Artifact Registry repositories"""
-    artifact_client = artifactregistry_v1.ArtifactRegistryClient()
-    try:
-        for location in LOCATIONS:
-            parent = f"projects/{project_id}/locations/{location}"
-            repos = artifact_client.list_repositories(parent=parent)
-            for repo in repos:
-                labels = repo.labels or {}
-                modified = False
-
-                for key, value in LABELS_MAP.items():
-                    if labels.get(key) != value:
-                        labels[key] = value
-                        modified = True
-
-                labels['project_id'] = project_id
-
-                if modified:
-                    repo.labels = labels
-                    artifact_client.update_repository(
-                        repository=repo,
-                        update_mask={"paths": ["labels"]}
-                    )
-                    logging.info(f"[Artifact] Added labels to repo '{repo.name.split('/')[-1]}': {labels}")
-    except GoogleAPICallError as e:
-        logging.error(f"[Artifact] Error: {e}")
-
-def check_dataproc_metastore_labels(project_id):
-    """Check and add all required labels to Dataproc Metastore services"""
-    client = metastore_v1.DataprocMetastoreClient()
-    try:
-        for location in LOCATIONS:
-            parent = f"projects/{project_id}/locations/{location}"
-            services = client.list_services(parent=parent)
-            for service in services:
-                labels = service.labels or {}
-                modified = False
-
-                for key, value in LABELS_MAP.items():
-                    if labels.get(key) != value:
-                        labels[key] = value
-                        modified = True
-
-                labels['project_id'] = project_id
-
-                if modified:
-                    service.labels = labels
-                    update_mask = field_mask_pb2.FieldMask(paths=["labels"])
-                    client.update_service(service=service, update_mask=update_mask)
-                    logging.info(f"[Metastore] Added labels to service '{service.name.split('/')[-1]}': {labels}")
-    except GoogleAPICallError as e:
-        logging.error(f"[Metastore] Error: {e}")
-
-def check_pubsub_labels(project_id):
-    """Check and add all required labels to Pub/Sub subscriptions"""
-    subscriber = pubsub_v1.SubscriberClient()
-    try:
-        project_path = f"projects/{project_id}"
-        subs = subscriber.list_subscriptions(request={"project": project_path})
-        for sub in subs:
-            labels = sub.labels or {}
-            modified = False
-
-            for key, value in LABELS_MAP.items():
-                if labels.get(key) != value:
-                    labels[key] = value
-                    modified = True
-
-            labels['project_id'] = project_id
-
-            if modified:
-                sub.labels = labels
-                update_mask = field_mask_pb2.FieldMask(paths=["labels"])
-                subscriber.update_subscription(
-                    subscription={"name": sub.name, "labels": labels},
-                    update_mask=update_mask
-                )
-                logging.info(f"[PubSub] Added labels to sub '{sub.name.split('/')[-1]}': {labels}")
-    except GoogleAPICallError as e:
-        logging.error(f"[PubSub] Error: {e}")
+# Requests per second allowed against each API (override with SCAN_RATE_<SERVICE>)
+RATE_LIMITS = {
+    'storage': 10,
+    'bigquery': 10,
+    'artifactregistry': 5,
+    'metastore': 2,
+    'pubsub': 10,
+}
 
 if __name__ == "__main__":
     # ✅ List of project IDs to process
@@ -154,25 +35,60 @@ if __name__ == "__main__":
         'adk-short-bot-465311',
     ]
 
-    for project_id in project_ids:
+    parser = argparse.ArgumentParser(description="Fix the labels of every resource that breaks the label policy")
+    parser.add_argument("--policy", default=DEFAULT_PATH, help="label policy file")
+    parser.add_argument("--dry-run", action="store_true", help="print the change plan without applying it")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--retries", type=int, default=RETRIES, help="retries per write on quota errors")
+    add_arguments(parser, checkpoint="label_fix.checkpoint")
+    parser.add_argument(
+        "--location-cache", default="locations_cache.json", help="discovered and empty locations, kept for a day"
+    )
+    args = parser.parse_args()
+    project_ids = project_ids_from(args, project_ids)
+
+    providers = gcp_providers(limiters_from_env(RATE_LIMITS))
+    policy = Policy.load(args.policy)
+
+    # ✅ Discover the locations in use, concurrently; empty ones are skipped until the cache expires
+    location_cache = LocationCache(args.location_cache)
+    locations = discover_locations(project_ids, providers, location_cache, LOCATIONS)
+    units = scan_units(project_ids, providers, locations)
+    checkpoint = None
+    if not args.dry_run:
+        checkpoint = Checkpoint(args.checkpoint, "tag", args.resume)
+        units = checkpoint.remaining(units)
+        if checkpoint.completed:
+            logging.info(f"Resuming: {len(checkpoint.completed)} units already done, {len(units)} to go")
+
+    if args.dry_run:
+        # ✅ Plan: list every (project, service, location) concurrently and diff the labels
+        start = time.perf_counter()
+        plan = build_plan(providers, policy, units, args.workers)
+        logging.info(
+            f"\n🔧 Planned {len(plan.changes)} changes over {plan.checked} resources"
+            f" in {time.perf_counter() - start:.1f}s"
+        )
+        for _, error in plan.errors:
+            logging.error(f"❌ {error}")
+        location_cache.save()
+        for change in plan.changes:
+            print(format_change(providers, change))
+    else:
+        # ✅ List once, applying fixes as their pages are listed: concurrent, rate limited, conditional writes
+        # A unit is checkpointed once it is listed and all its changes are applied; failed units are retried on --resume
+        pending = PendingUnits(checkpoint)
+        fixes = Remediator(
+            providers, args.workers, args.retries,
+            on_queued=lambda change: pending.queued(change.unit),
+            on_result=lambda change, outcome: pending.finished(change.unit, outcome == "applied"),
+        )
+        sink = FindingSink([ErrorLog(providers)])
+        check = functools.partial(check_unit, providers, policy, fixes=fixes)
         try:
-            logging.info(f"\n🔧 Starting label checks for project: {project_id}")
-
-            logging.info("\n=== Processing Cloud Storage ===")
-            check_storage_labels(project_id)
-
-            logging.info("\n=== Processing BigQuery ===")
-            check_bigquery_labels(project_id)
-
-            logging.info("\n=== Processing Artifact Registry ===")
-            check_artifact_labels(project_id)
-
-            logging.info("\n=== Processing Dataproc Metastore ===")
-            check_dataproc_metastore_labels(project_id)
-
-            logging.info("\n=== Processing Pub/Sub ===")
-            check_pubsub_labels(project_id)
-
-            logging.info(f"\n✅ Label check complete for project: {project_id}\n{'=' * 50}")
-        except Exception as e:
-            logging.error(f"❌ Error processing project {project_id}: {e}")
+            run_units(units, functools.partial(run_check, check, sink, checkpoint=pending), args.workers)
+        finally:
+            summary = fixes.close()
+            checkpoint.close()
+            location_cache.save()
+        logging.info(f"\n✅ Label remediation complete: {summary}\n{'=' * 50}")
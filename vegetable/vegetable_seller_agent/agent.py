@@ -1,48 +1,177 @@
-from google.adk.a2a.utils.agent_to_a2a import to_a2a
+import asyncio
+import os
+
 from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.tool_context import ToolContext
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from .admission import AdmissionController
+from .cancellation import to_cancellable_a2a
+from .feed import ChangeFeed, feed_routes
+from .inventory import Inventory
+from .model_tier import ModelRouter
+from .reservations import HoldBook
 
 # 🥕 Inventory of vegetables
-inventory = {
-    "carrot": {"price": 30, "stock": 15},
-    "potato": {"price": 25, "stock": 20},
-    "onion": {"price": 35, "stock": 12}
-}
+inventory = Inventory(
+    {
+        "carrot": {"price": 30, "stock": 15},
+        "potato": {"price": 25, "stock": 20},
+        "onion": {"price": 35, "stock": 12}
+    },
+    separator=", ",
+)
+
+# 🔒 Stock holds for the confirm-then-buy flow, keyed by A2A contextId
+holds = HoldBook(
+    inventory, ttl_seconds=float(os.getenv("RESERVATION_TTL_SECONDS", "300"))
+)
+
+# 🚦 Admission control in front of the A2A handler (applied by server.py)
+admission = AdmissionController(
+    max_concurrency=int(os.getenv("SELLER_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("SELLER_MAX_QUEUE", "32")),
+    max_wait=float(os.getenv("SELLER_MAX_QUEUE_WAIT_SECONDS", "10")),
+    rate=float(os.getenv("SELLER_RATE_PER_SECOND", "5")),
+    burst=int(os.getenv("SELLER_RATE_BURST", "10")),
+)
+
+# 📡 Change feed of inventory mutations for subscribers
+feed = ChangeFeed(inventory)
 
 # ✅ Tool: Show available vegetables
-def show_vegetables() -> str:
-    """List available vegetables with their prices."""
-    return ", ".join([f"{veg.capitalize()}: ₹{data['price']}" for veg, data in inventory.items()])
+def show_vegetables(if_none_match: str) -> str:
+    """List available vegetables with their prices.
+
+    Args:
+        if_none_match: The inventory ETag the caller already has, or an empty
+            string. When it matches the current ETag only "unchanged" is returned.
+    """
+    catalog = inventory.render()
+    if if_none_match and if_none_match.strip() == catalog.etag:
+        return f"unchanged (ETag: {catalog.etag}, version {catalog.version})"
+    return f"{catalog.text} (ETag: {catalog.etag}, version {catalog.version})"
 
 # ✅ Tool: Buy a vegetable
 def buy_vegetable(vegetable: str, quantity: int) -> str:
     """Buy a vegetable from the inventory."""
     if vegetable not in inventory:
         return f"Sorry, {vegetable} is not available."
-    if inventory[vegetable]["stock"] < quantity:
-        return f"Sorry, we only have {inventory[vegetable]['stock']} {vegetable}(s) in stock."
-    inventory[vegetable]["stock"] -= quantity
-    total = inventory[vegetable]["price"] * quantity
+    if quantity <= 0:
+        return "Sorry, the quantity must be at least 1."
+    if not inventory.buy(vegetable, quantity):
+        return f"Sorry, we only have {inventory.available(vegetable)} {vegetable}(s) available."
+    total = inventory.price(vegetable) * quantity
     return f"You have bought {quantity} {vegetable}(s) for ₹{total}."
 
+def _context_id(tool_context: ToolContext) -> str:
+    # The A2A executor runs each contextId as its own ADK session
+    return tool_context.session.id
+
+# ✅ Tool: Reserve a vegetable until the buyer confirms
+def reserve_vegetable(vegetable: str, quantity: int, tool_context: ToolContext) -> str:
+    """Hold a vegetable for this conversation until the purchase is confirmed or the hold expires."""
+    if vegetable not in inventory:
+        return f"Sorry, {vegetable} is not available."
+    if quantity <= 0:
+        return "Sorry, the quantity must be at least 1."
+    if not holds.reserve(_context_id(tool_context), vegetable, quantity):
+        return f"Sorry, we only have {inventory.available(vegetable)} {vegetable}(s) available."
+    minutes = holds.ttl_seconds / 60
+    return (
+        f"Reserved {quantity} {vegetable}(s) for ₹{inventory.price(vegetable) * quantity}. "
+        f"The hold expires in {minutes:g} minutes unless the purchase is confirmed."
+    )
+
+# ✅ Tool: Confirm the reserved purchase
+def confirm_purchase(tool_context: ToolContext) -> str:
+    """Buy everything currently reserved for this conversation."""
+    sold = holds.confirm(_context_id(tool_context))
+    if not sold:
+        return "There is no active reservation to confirm. It may have expired; reserve again."
+    lines = [f"{quantity} {name}(s) for ₹{inventory.price(name) * quantity}" for name, quantity in sold.items()]
+    total = sum(inventory.price(name) * quantity for name, quantity in sold.items())
+    return "You have bought " + ", ".join(lines) + f". Total: ₹{total}."
+
+# ✅ Tool: Release the reservation
+def release_reservation(tool_context: ToolContext) -> str:
+    """Cancel the reservation for this conversation and return the items to stock."""
+    if holds.release(_context_id(tool_context)):
+        return "Your reservation has been released."
+    return "There is no active reservation."
+
+# ✅ Callback: Stamp the inventory version into the A2A task metadata
+def stamp_inventory_version(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> None:
+    catalog = inventory.render()
+    llm_response.custom_metadata = {
+        **(llm_response.custom_metadata or {}),
+        "inventory_version": catalog.version,
+        "inventory_etag": catalog.etag,
+    }
+
+# 🪜 Model ladder: plain lookups on the light model, harder turns and retries on the full one
+router = ModelRouter.from_env("gemini-2.0-flash-lite,gemini-2.0-flash")
+
 # ✅ Root ADK Agent
 root_agent = Agent(
     name="vegetable_seller_agent",
     description="A vegetable seller who sells vegetables to customers",
-    model="gemini-2.0-flash",
+    model=router.ladder[0],
     instruction="""You can ask me what vegetables are available or buy vegetables like carrots, potatoes, and onions. You can also ask me to show the inventory. Output should be in markdown format with bullets if needed. 
 - If the user asks for a vegetable that is not available, say that it is not available.
 - If the user asks for a vegetable that is available, say that it is available and the price.
 - If the user asks for the inventory, show the inventory.
-- If the user asks to buy a vegetable, say that you will buy the vegetable and the price.
-- If the user asks to buy a vegetable with a quantity, say that you will buy the vegetable and the price.
+- When calling show_vegetables, pass the inventory ETag the user gave you (for example "if-none-match: <etag>") as if_none_match, otherwise pass an empty string. If the tool says "unchanged", reply only that the inventory is unchanged along with the ETag.
+- If the user asks to buy a vegetable (with or without a quantity), reserve it with reserve_vegetable and reply with the price, the total and that the hold expires unless confirmed. Ask the user to confirm.
+- If the user confirms the order, call confirm_purchase and show what was bought and the total.
+- If the user cancels or changes their mind, call release_reservation.
 - If the user asks to buy a vegetable with a quantity that is not available, say that only that much is available.
+- Only use buy_vegetable when the user explicitly asks to buy immediately without a reservation.
 - Use LLM to respond to other questions that are not handled by tools.
 """,
-    tools=[show_vegetables, buy_vegetable],
+    tools=[show_vegetables, buy_vegetable, reserve_vegetable, confirm_purchase, release_reservation],
+    before_model_callback=router.before_model,
+    after_model_callback=[stamp_inventory_version, router.after_model],
+    after_tool_callback=router.after_tool,
 )
 
-# Expose the agent via A2A
-from google.adk.a2a.utils.agent_to_a2a import to_a2a
+# 📊 Inventory, hold, feed, admission and model tier metrics
+async def metrics(request: Request) -> JSONResponse:
+    return JSONResponse(
+        {
+            "inventory_version": inventory.version,
+            "holds": holds.stats(),
+            "feed": feed.stats(),
+            "admission": admission.stats(),
+            "cancellation": executor.stats() if executor else {},
+            "models": router.stats(),
+        }
+    )
+
+_expiry_task: asyncio.Task | None = None
+executor = None
 
-a2a_app = to_a2a(root_agent, port=8001)
+async def start_hold_expiry() -> None:
+    global _expiry_task
+    _expiry_task = asyncio.create_task(holds.run_expiry())
+
+# Expose the agent via A2A
+def build_a2a_app(host: str = "127.0.0.1", port: int = 8001):
+    """Make the agent A2A-compatible with the seller's extra routes.
 
+    The agent card, the ``/metrics`` and ``/inventory`` routes and the hold
+    expiry sweeper are all set up when the returned app starts.
+    """
+    global executor
+    # tasks/cancel and the caller's X-Request-Deadline both stop a running task
+    a2a_app, executor = to_cancellable_a2a(root_agent, host=host, port=port)
+    a2a_app.routes.append(Route("/metrics", metrics, methods=["GET"]))
+    a2a_app.routes.extend(feed_routes(feed))
+    a2a_app.add_event_handler("startup", start_hold_expiry)
+    return a2a_app
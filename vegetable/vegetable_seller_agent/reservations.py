@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable
+
+from .inventory import Inventory
+
+
+class HoldBook:
+    """Stock holds for the confirm-then-buy flow, keyed by A2A ``contextId``.
+
+    A context owns at most one hold, which may cover several items. Holds
+    expire ``ttl_seconds`` after their last ``reserve``. Expiry deadlines
+    live in a single min-heap: every operation pops whatever is due, and
+    ``run_expiry`` sweeps it periodically so idle holds are returned to
+    stock without one timer per hold. Heap entries are not removed when a
+    hold is refreshed or closed; stale ones are skipped when popped.
+    """
+
+    def __init__(
+        self,
+        inventory: Inventory,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.inventory = inventory
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._holds: dict[str, dict] = {}
+        self._deadlines: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._counters = {"reserved": 0, "confirmed": 0, "released": 0, "expired": 0}
+
+    def reserve(self, context_id: str, name: str, quantity: int) -> bool:
+        """Hold ``quantity`` of ``name`` for ``context_id``, replacing any earlier hold on that item.
+
+        Returns False when not enough stock is available. Raises ValueError
+        when ``quantity`` is not positive.
+        """
+        if quantity <= 0:
+            raise ValueError(f"Quantity must be positive, got {quantity}")
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            hold = self._holds.get(context_id)
+            previous = hold["items"].get(name, 0) if hold else 0
+            if previous:
+                self.inventory.unhold(name, previous)
+            if not self.inventory.hold(name, quantity):
+                if previous:
+                    self.inventory.hold(name, previous)
+                return False
+            if hold is None:
+                hold = self._holds[context_id] = {"items": {}, "expires_at": 0.0}
+                self._counters["reserved"] += 1
+            hold["items"][name] = quantity
+            hold["expires_at"] = now + self.ttl_seconds
+            heapq.heappush(
+                self._deadlines, (hold["expires_at"], next(self._seq), context_id)
+            )
+            return True
+
+    def held(self, context_id: str) -> dict[str, int]:
+        """Items currently held for ``context_id``."""
+        with self._lock:
+            self._expire(self._clock())
+            hold = self._holds.get(context_id)
+            return dict(hold["items"]) if hold else {}
+
+    def confirm(self, context_id: str) -> dict[str, int]:
+        """Turn the context's hold into a sale. Returns the items sold (empty if nothing was held)."""
+        with self._lock:
+            self._expire(self._clock())
+            hold = self._holds.pop(context_id, None)
+            if hold is None:
+                return {}
+            for name, quantity in hold["items"].items():
+                self.inventory.commit(name, quantity)
+            self._counters["confirmed"] += 1
+            return hold["items"]
+
+    def release(self, context_id: str) -> bool:
+        """Drop the context's hold and return its units to stock."""
+        with self._lock:
+            self._expire(self._clock())
+            hold = self._holds.pop(context_id, None)
+            if hold is None:
+                return False
+            self._return(hold)
+            self._counters["released"] += 1
+            return True
+
+    def expire(self) -> int:
+        """Release every hold whose TTL has passed. Returns how many expired."""
+        with self._lock:
+            return self._expire(self._clock())
+
+    async def run_expiry(self, interval: float = 1.0) -> None:
+        """Sweep expired holds forever; run as one background task per process."""
+        while True:
+            self.expire()
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            reserved = self._counters["reserved"]
+            return {
+                **self._counters,
+                "active": len(self._holds),
+                "conversion_rate": self._counters["confirmed"] / reserved if reserved else 0.0,
+                "expiry_rate": self._counters["expired"] / reserved if reserved else 0.0,
+            }
+
+    def _expire(self, now: float) -> int:
+        expired = 0
+        while self._deadlines and self._deadlines[0][0] <= now:
+            expires_at, _, context_id = heapq.heappop(self._deadlines)
+            hold = self._holds.get(context_id)
+            if hold is None or hold["expires_at"] != expires_at:
+                continue
+            del self._holds[context_id]
+            self._return(hold)
+            self._counters["expired"] += 1
+            expired += 1
+        return expired
+
+    def _return(self, hold: dict) -> None:
+        for name, quantity in hold["items"].items():
+            self.inventory.unhold(name, quantity)